@@ -6,6 +6,7 @@ import xgboost as xgb
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 import matplotlib.pyplot as plt
 import seaborn as sns
+from synthetic_bids import generate_bid_chunk
 
 class BidSuccessPredictionModel:
     """
@@ -30,89 +31,9 @@ class BidSuccessPredictionModel:
         Returns:
         - DataFrame with synthetic bid data
         """
-        np.random.seed(seed)
-        
-        # Define common job categories for our synthetic data
-        job_categories = ['Web Development', 'Data Science', 'Machine Learning', 
-                         'Mobile App Development', 'Content Writing', 'Graphic Design']
-        
-        # Define skill levels for freelancers
-        experience_levels = ['Beginner', 'Intermediate', 'Expert']
-        
-        # Generate synthetic data
-        data = {
-            # Freelancer characteristics
-            'user_experience_years': np.random.uniform(0, 10, n_samples),
-            'user_rating': np.random.uniform(3, 5, n_samples),
-            'user_completion_rate': np.random.uniform(0.7, 1.0, n_samples),
-            'user_skill_level': np.random.choice(experience_levels, n_samples),
-            
-            # Job characteristics
-            'job_category': np.random.choice(job_categories, n_samples),
-            'job_budget_min': np.random.randint(50, 5000, n_samples),
-            'job_required_experience': np.random.choice(experience_levels, n_samples),
-            'job_duration_days': np.random.randint(1, 180, n_samples),
-            'client_rating': np.random.uniform(3, 5, n_samples),
-            
-            # Bid characteristics
-            'bid_amount': np.zeros(n_samples),  # Will be calculated based on budget
-            'bid_amount_relative': np.random.uniform(0.7, 1.3, n_samples),  # Relative to average
-            'proposal_length': np.random.randint(50, 1000, n_samples),
-            'keyword_match_count': np.random.randint(0, 10, n_samples),
-            'response_time_hours': np.random.exponential(24, n_samples),
-            
-            # Competition factors
-            'number_of_bids': np.random.randint(1, 50, n_samples),
-            'average_competitor_rating': np.random.uniform(3, 5, n_samples),
-            
-            # Skill match - 0 to 1 representing percentage match
-            'skill_match': np.random.uniform(0.3, 1.0, n_samples),
-            
-            # Gamification elements
-            'user_level': np.random.randint(1, 50, n_samples),
-            'user_badges_count': np.random.randint(0, 20, n_samples),
-            'user_quest_completion': np.random.randint(0, 100, n_samples),
-        }
-        
-        # Create DataFrame
-        df = pd.DataFrame(data)
-        
-        # Calculate bid amount based on job budget and relative positioning
-        df['bid_amount'] = df['job_budget_min'] * df['bid_amount_relative']
-        
-        # Encode categorical variables
-        df = pd.get_dummies(df, columns=['job_category', 'user_skill_level', 'job_required_experience'])
-        
-        # Create target variable - bid success
-        # This creates a realistic success probability based on various factors
-        success_probability = (
-            0.8 * (df['user_rating'] - 3) / 2 +  # Higher rating increases chances
-            0.6 * (df['user_completion_rate'] - 0.7) / 0.3 +  # Higher completion rate helps
-            0.7 * (df['skill_match'] - 0.3) / 0.7 +  # Skill match is important
-            -0.5 * (df['bid_amount_relative'] - 0.7) / 0.6 +  # Lower bids tend to win
-            0.3 * np.minimum(df['proposal_length'] / 500, 1) +  # Better proposals help to a point
-            0.3 * (df['keyword_match_count'] / 10) +  # Keywords matching helps
-            -0.4 * (np.minimum(df['response_time_hours'], 72) / 72) +  # Faster responses are better
-            -0.3 * (df['number_of_bids'] / 50) +  # More competition reduces chances
-            0.2 * (df['user_experience_years'] / 10) +  # Experience helps
-            0.1 * (df['user_level'] / 50) +  # Higher level gives slight advantage
-            np.random.normal(0, 0.2, n_samples)  # Random noise for realism
-        )
-        
-        # Normalize to 0-1 range
-        success_probability = (success_probability - success_probability.min()) / (success_probability.max() - success_probability.min())
-        
-        # Convert to binary outcome
-        df['bid_successful'] = (success_probability > np.random.uniform(0, 1, n_samples)).astype(int)
-        
-        # Store success probability for later use (useful for understanding model performance)
-        df['true_success_probability'] = success_probability
-        
-        # Add timestamps for temporal features
-        now = pd.Timestamp.now()
-        df['job_posted_date'] = [now - pd.Timedelta(days=np.random.randint(1, 30)) for _ in range(n_samples)]
-        df['bid_submitted_date'] = [posted + pd.Timedelta(hours=np.random.randint(1, 48)) 
-                                   for posted in df['job_posted_date']]
+        # Vectorized generator with its own random stream (the global NumPy
+        # seed is left alone); see synthetic_bids.py for sharded generation
+        df = generate_bid_chunk(n_samples, np.random.default_rng(seed))
         
         print(f"Generated {n_samples} synthetic bid records with {df['bid_successful'].mean()*100:.1f}% success rate")
         return df
@@ -0,0 +1,165 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Same vocabularies as BidSuccessPredictionModel.generate_synthetic_data
+JOB_CATEGORIES = ['Web Development', 'Data Science', 'Machine Learning',
+                  'Mobile App Development', 'Content Writing', 'Graphic Design']
+EXPERIENCE_LEVELS = ['Beginner', 'Intermediate', 'Expert']
+
+
+def _one_hot(prefix, choices, index, columns):
+    # Matches pd.get_dummies column naming and (sorted) order, but always
+    # emits every category so all chunks share one schema
+    for position in np.argsort(choices):
+        columns[f"{prefix}_{choices[position]}"] = index == position
+
+
+def generate_bid_chunk(n_samples, rng, now=None):
+    """
+    Generates one chunk of synthetic bids, fully vectorized.
+
+    The columns and distributions are those of ``generate_synthetic_data``.
+    The success probability is min-max normalized within the chunk, as the
+    original does over its whole sample.
+
+    :param n_samples: Rows in the chunk.
+    :param rng: ``np.random.Generator`` owned by this chunk.
+    :param now: Reference timestamp for the date columns (default: now).
+    :return: DataFrame of synthetic bid records.
+    """
+    n = n_samples
+    data = {
+        # Freelancer characteristics
+        'user_experience_years': rng.uniform(0, 10, n),
+        'user_rating': rng.uniform(3, 5, n),
+        'user_completion_rate': rng.uniform(0.7, 1.0, n),
+
+        # Job characteristics
+        'job_budget_min': rng.integers(50, 5000, n),
+        'job_duration_days': rng.integers(1, 180, n),
+        'client_rating': rng.uniform(3, 5, n),
+
+        # Bid characteristics
+        'bid_amount': np.zeros(n),  # Calculated below from the budget
+        'bid_amount_relative': rng.uniform(0.7, 1.3, n),
+        'proposal_length': rng.integers(50, 1000, n),
+        'keyword_match_count': rng.integers(0, 10, n),
+        'response_time_hours': rng.exponential(24, n),
+
+        # Competition factors
+        'number_of_bids': rng.integers(1, 50, n),
+        'average_competitor_rating': rng.uniform(3, 5, n),
+
+        # Skill match - 0 to 1 representing percentage match
+        'skill_match': rng.uniform(0.3, 1.0, n),
+
+        # Gamification elements
+        'user_level': rng.integers(1, 50, n),
+        'user_badges_count': rng.integers(0, 20, n),
+        'user_quest_completion': rng.integers(0, 100, n),
+    }
+    data['bid_amount'] = data['job_budget_min'] * data['bid_amount_relative']
+
+    # Categorical columns, already one-hot encoded
+    _one_hot('job_category', JOB_CATEGORIES, rng.integers(0, len(JOB_CATEGORIES), n), data)
+    _one_hot('user_skill_level', EXPERIENCE_LEVELS, rng.integers(0, len(EXPERIENCE_LEVELS), n), data)
+    _one_hot('job_required_experience', EXPERIENCE_LEVELS, rng.integers(0, len(EXPERIENCE_LEVELS), n), data)
+
+    # Bid success, from the same weighted factors as the original model
+    success_probability = (
+        0.8 * (data['user_rating'] - 3) / 2 +
+        0.6 * (data['user_completion_rate'] - 0.7) / 0.3 +
+        0.7 * (data['skill_match'] - 0.3) / 0.7 +
+        -0.5 * (data['bid_amount_relative'] - 0.7) / 0.6 +
+        0.3 * np.minimum(data['proposal_length'] / 500, 1) +
+        0.3 * (data['keyword_match_count'] / 10) +
+        -0.4 * (np.minimum(data['response_time_hours'], 72) / 72) +
+        -0.3 * (data['number_of_bids'] / 50) +
+        0.2 * (data['user_experience_years'] / 10) +
+        0.1 * (data['user_level'] / 50) +
+        rng.normal(0, 0.2, n)
+    )
+    success_probability = (success_probability - success_probability.min()) / np.ptp(success_probability)
+    data['bid_successful'] = (success_probability > rng.uniform(0, 1, n)).astype(int)
+    data['true_success_probability'] = success_probability
+
+    # Timestamps, as datetime64 arithmetic instead of per-row Timedeltas
+    now = np.datetime64(pd.Timestamp.now() if now is None else pd.Timestamp(now), 'us')
+    data['job_posted_date'] = now - rng.integers(1, 30, n).astype('timedelta64[D]')
+    data['bid_submitted_date'] = data['job_posted_date'] + rng.integers(1, 48, n).astype('timedelta64[h]')
+    return pd.DataFrame(data)
+
+
+def chunk_streams(seed, n_chunks):
+    """
+    Independent random streams, one per chunk, derived from a single seed. A
+    chunk's rows depend only on (seed, chunk index, chunk size), never on
+    which worker produced it.
+    """
+    return [np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(n_chunks)]
+
+
+def write_shard(df, path, fmt):
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        np.save(path, df.to_records(index=False))
+
+
+def generate_shard(output_dir, chunk, n_samples, rng, now, fmt):
+    """
+    Generates one chunk and writes it as a shard file.
+
+    :return: ``(path, rows, successes)``
+    """
+    df = generate_bid_chunk(n_samples, rng, now)
+    path = os.path.join(output_dir, f"bids_{chunk:05d}.{'parquet' if fmt == 'parquet' else 'npy'}")
+    write_shard(df, path, fmt)
+    return path, len(df), int(df['bid_successful'].sum())
+
+
+def generate_to_shards(output_dir, n_samples, chunk_size=1_000_000, seed=42, workers=1, fmt='parquet', now=None):
+    """
+    Generates ``n_samples`` synthetic bids as Parquet or ``.npy`` shards of
+    ``chunk_size`` rows, in parallel. Peak memory is one chunk per worker.
+
+    :param fmt: ``"parquet"`` or ``"npy"`` (structured record arrays).
+    :return: List of shard paths, in chunk order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    now = pd.Timestamp.now().floor('s') if now is None else pd.Timestamp(now)  # One reference time for every shard
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    streams = chunk_streams(seed, len(sizes))
+    args = [(output_dir, chunk, size, rng, now, fmt) for chunk, (size, rng) in enumerate(zip(sizes, streams))]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [generate_shard(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(generate_shard, *zip(*args)))
+    seconds = time.perf_counter() - start
+
+    rows = sum(shard_rows for _, shard_rows, _ in results)
+    successes = sum(shard_successes for _, _, shard_successes in results)
+    print(f"Generated {rows:,} synthetic bid records in {len(results)} shards with "
+          f"{successes / max(rows, 1) * 100:.1f}% success rate in {seconds:.2f}s ({rows / seconds:,.0f} rows/sec)")
+    return [path for path, _, _ in results]
+
+
+# Example usage: python synthetic_bids.py synthetic_bids --rows 200000000 --chunk-size 2000000 --workers 16
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic bid training data as shards.")
+    parser.add_argument("output_dir")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--format", choices=["parquet", "npy"], default="parquet")
+    args = parser.parse_args()
+
+    generate_to_shards(args.output_dir, args.rows, args.chunk_size, args.seed, args.workers, args.format)
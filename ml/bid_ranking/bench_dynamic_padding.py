@@ -0,0 +1,94 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from clarity_predict import predict_bucketed
+from numpy_clarity import NumpyClarityModel
+
+
+def random_masked_weights(path, num_words=5000, embedding_dim=64, units=64, seed=0):
+    """
+    Writes random clarity-model weights (same shapes as the trained model,
+    with padding masked) so the benchmark runs without trained artifacts.
+    """
+    rng = np.random.default_rng(seed)
+    weight = lambda *shape: (rng.standard_normal(shape) * 0.1).astype(np.float32)
+    np.savez(
+        path,
+        embeddings=weight(num_words, embedding_dim),
+        lstm_kernel=weight(embedding_dim, 4 * units),
+        lstm_recurrent_kernel=weight(units, 4 * units),
+        lstm_bias=weight(4 * units),
+        dense_0_kernel=weight(units, 32), dense_0_bias=weight(32),
+        dense_1_kernel=weight(32, 1), dense_1_bias=weight(1),
+        dense_activations=np.array(["relu", "linear"]),
+        mask_zero=np.array(True),
+    )
+
+
+def synthetic_padded_bids(n_bids, max_length, num_words=5000, seed=0):
+    """
+    Padded token ids with a right-skewed (log-normal) bid length distribution:
+    most bids are one or two sentences, a few are long.
+    """
+    rng = np.random.default_rng(seed)
+    lengths = np.clip(rng.lognormal(mean=np.log(max_length / 4), sigma=0.6, size=n_bids).astype(int), 1, max_length)
+    padded = np.zeros((n_bids, max_length), dtype=np.int32)
+    tokens = rng.integers(1, num_words, size=(n_bids, max_length), dtype=np.int32)
+    mask = np.arange(max_length) < lengths[:, None]
+    padded[mask] = tokens[mask]
+    return padded, lengths
+
+
+def run(model, padded, bucket_counts, batch_size, repeats):
+    """
+    Measures throughput for each bucket count; one bucket is fixed-length padding.
+
+    :return: List of result dicts.
+    """
+    reference = model.predict(padded, batch_size=batch_size).reshape(-1)
+    results = []
+    for buckets in bucket_counts:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            scores = predict_bucketed(model, padded, buckets, batch_size)
+            times.append(time.perf_counter() - start)
+        seconds = min(times)
+        results.append({
+            "buckets": buckets,
+            "seconds": seconds,
+            "bids_per_sec": len(padded) / seconds,
+            "max_abs_diff": float(np.abs(scores - reference).max()),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark clarity inference throughput against bucket count.")
+    parser.add_argument("--model-path", default=None, help="Masked .npz model (random weights if omitted)")
+    parser.add_argument("--bids", type=int, default=20_000)
+    parser.add_argument("--max-length", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--buckets", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.model_path is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "clarity_random.npz")
+            random_masked_weights(path)
+            model = NumpyClarityModel(path)
+    else:
+        model = NumpyClarityModel(args.model_path)
+        if not model.mask_zero:
+            raise SystemExit("Dynamic padding needs a model trained with mask_zero=True")
+
+    padded, lengths = synthetic_padded_bids(args.bids, args.max_length)
+    print(f"{args.bids} bids, max_length={args.max_length}, mean length={lengths.mean():.1f}")
+    results = run(model, padded, args.buckets, args.batch_size, args.repeats)
+    baseline = results[0]["seconds"]
+    for result in results:
+        print(f"buckets={result['buckets']:>3}  {result['bids_per_sec']:>10,.0f} bids/sec  "
+              f"speedup={baseline / result['seconds']:.2f}x  max_abs_diff={result['max_abs_diff']:.2e}")
@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import joblib
+import numpy as np
+import main
+from clarity_predict import ClarityPredictor
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Word pools for synthetic bids (no network or real data needed)
+OPENERS = ["I am a", "As a", "Hi, I'm a", "I have worked as a", "Hello! I am an experienced"]
+ROLES = ["web developer", "data scientist", "graphic designer", "content writer", "mobile app developer",
+         "UI/UX designer", "project manager", "machine learning engineer", "video editor", "copywriter"]
+CLAIMS = ["with 5+ years of experience", "who delivers on time", "with a strong portfolio",
+          "specializing in scalable solutions", "focused on client satisfaction", "eager to learn"]
+DETAILS = ["I can start immediately.", "Let's discuss the details.", "I guarantee quality work within budget.",
+           "I have completed similar projects for startups and enterprises.", "Hire me!",
+           "My approach includes clear milestones, weekly updates and thorough testing before delivery."]
+
+
+def synthetic_bids(n, seed=0):
+    """
+    Generates ``n`` bid texts with a realistic spread of lengths.
+    """
+    rng = np.random.default_rng(seed)
+    bids = []
+    for _ in range(n):
+        details = " ".join(rng.choice(DETAILS, size=rng.integers(0, 4)))
+        bids.append(f"{rng.choice(OPENERS)} {rng.choice(ROLES)} {rng.choice(CLAIMS)}. {details}".strip())
+    return bids
+
+
+def percentiles_ms(samples):
+    p50, p95, p99 = np.percentile(np.asarray(samples) * 1000, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "mean_ms": float(np.mean(samples) * 1000)}
+
+
+def cold_start(code, cwd):
+    """
+    Runs ``code`` in a fresh interpreter and returns its wall time in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [MODULE_DIR, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=MODULE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(model_path, tokenizer_path, regression_path, n_bids=2000, single_iterations=200,
+                   batch_sizes=(1, 8, 32, 128, 512), seed=0):
+    """
+    Runs the full benchmark suite against the given artifacts.
+
+    :return: Dict of results, ready to be written as JSON.
+    """
+    model_path, tokenizer_path, regression_path = map(os.path.abspath, (model_path, tokenizer_path, regression_path))
+    results = {}
+
+    # Cold start in fresh interpreters (imports + artifact loading + first prediction)
+    results["cold_start_seconds"] = {
+        "clarity_predictor": cold_start(
+            f"from clarity_predict import ClarityPredictor\n"
+            f"ClarityPredictor({model_path!r}, {tokenizer_path!r}).predict_clarity_score('warm up')", MODULE_DIR),
+        "main_import": cold_start("import main", MODULE_DIR),
+        "main_first_prediction": cold_start(
+            f"import main\n"
+            f"main.DL_MODEL_PATH, main.TOKENIZER_PATH = {model_path!r}, {tokenizer_path!r}\n"
+            f"main.LR_MODEL_PATH, main.CLARITY_CACHE_PATH = {regression_path!r}, None\n"
+            f"main.predict_bid_rank('warm up', 1, 100, 5)", MODULE_DIR),
+    }
+
+    # Point main at the benchmark artifacts, without the score cache
+    main.registry.register("clarity_model", lambda: ClarityPredictor(model_path, tokenizer_path))
+    main.registry.register("regression_model", lambda: joblib.load(regression_path))
+    main.warmup()
+    clarity_model = main.registry.get("clarity_model")
+    regression_model = main.registry.get("regression_model")
+
+    rng = np.random.default_rng(seed)
+    bids = synthetic_bids(n_bids, seed)
+    experience = rng.uniform(0, 10, n_bids)
+    price = rng.uniform(50, 2000, n_bids)
+    reputation = rng.uniform(1, 10, n_bids)
+
+    # Single-bid end-to-end latency
+    latencies = []
+    for i in range(single_iterations):
+        j = i % n_bids
+        start = time.perf_counter()
+        main.predict_bid_rank(bids[j], experience[j], price[j], reputation[j])
+        latencies.append(time.perf_counter() - start)
+    results["single_bid_latency"] = percentiles_ms(latencies)
+
+    # End-to-end throughput as a function of batch size
+    results["throughput_bids_per_sec"] = {}
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, n_bids, batch_size):
+            batch = slice(offset, offset + batch_size)
+            main.score_bids(bids[batch], experience[batch], price[batch], reputation[batch], batch_size=batch_size)
+        results["throughput_bids_per_sec"][str(batch_size)] = n_bids / (time.perf_counter() - start)
+
+    # Tokenizer-only cost
+    start = time.perf_counter()
+    clarity_model.encode(bids)
+    results["tokenizer_us_per_bid"] = (time.perf_counter() - start) / n_bids * 1e6
+
+    # Regression-only cost (single row and whole batch)
+    features = np.column_stack([rng.uniform(1, 10, n_bids), experience, price, reputation])
+    single = []
+    for i in range(single_iterations):
+        start = time.perf_counter()
+        regression_model.predict(features[i % n_bids:i % n_bids + 1])
+        single.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    regression_model.predict(features)
+    results["regression"] = {
+        "single_row": percentiles_ms(single),
+        "batch_us_per_bid": (time.perf_counter() - start) / n_bids * 1e6,
+    }
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["peak_rss_mb"] = peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    results["load_stats"] = main.registry.stats()
+    return results
+
+
+# Example usage: python benchmark.py --output bench_results.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite for the bid ranking stack.")
+    parser.add_argument("--model-path", default="clarity_score_model.h5")
+    parser.add_argument("--tokenizer-path", default="tokenizer.pkl")
+    parser.add_argument("--regression-path", default="bid_ranking_model.pkl")
+    parser.add_argument("--bids", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200, help="Single-bid latency samples")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128, 512])
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    import warnings
+    warnings.filterwarnings("ignore")  # sklearn feature-name warnings on every call
+
+    results = run_benchmarks(args.model_path, args.tokenizer_path, args.regression_path,
+                             n_bids=args.bids, single_iterations=args.iterations, batch_sizes=args.batch_sizes)
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "artifacts": {"model": args.model_path, "tokenizer": args.tokenizer_path, "regression": args.regression_path},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(json.dumps(results, indent=4))
+    print(f"Results written to '{args.output}'")
@@ -0,0 +1,151 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def artifact_fingerprint(*paths):
+    """
+    Returns a short content hash of the given artifact files. Publishing a new
+    model or tokenizer changes the fingerprint, and with it every cache key.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class ClarityCache:
+    """
+    Two-tier clarity score cache keyed by a hash of the encoded bid (its padded
+    token ids) and the model/tokenizer fingerprint: an in-process LRU in front of an optional
+    SQLite file shared across processes and restarts.
+    """
+
+    STALE_AFTER = 7 * 24 * 3600  # Seconds before another version's rows may be purged
+
+    def __init__(self, db_path=None, max_entries=100_000):
+        """
+        :param db_path: SQLite file for the persistent tier (memory only if None).
+        :param max_entries: Maximum number of scores kept in the in-process LRU.
+        """
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._db = None
+        if db_path is not None:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS clarity_scores (key TEXT PRIMARY KEY, version TEXT NOT NULL, score REAL NOT NULL, "
+                "written_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in self._db.execute("PRAGMA table_info(clarity_scores)")]
+            if "written_at" not in columns:  # Files created before rows were timestamped
+                self._db.execute("ALTER TABLE clarity_scores ADD COLUMN written_at REAL NOT NULL DEFAULT 0")
+            self._db.commit()
+
+    @staticmethod
+    def key(token_ids, version):
+        """
+        Cache key for one encoded bid. Keying on the token ids the model sees,
+        rather than the text, means two bids share a score exactly when the
+        tokenizer maps them to the same input.
+        """
+        token_ids = np.ascontiguousarray(token_ids, dtype=np.int32)
+        return hashlib.sha256(f"{version}\0".encode("utf-8") + token_ids.tobytes()).hexdigest()
+
+    def _remember(self, key, score):
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get_many(self, keys):
+        """
+        Looks up scores for the given keys.
+
+        :return: List aligned with ``keys`` holding a score or None for misses.
+        """
+        with self._lock:
+            results = [None] * len(keys)
+            pending = {}
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self._counters["memory_hits"] += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending and self._db is not None:
+                found = {}
+                pending_keys = list(pending)
+                for start in range(0, len(pending_keys), 500):  # Stay under SQLite's parameter limit
+                    chunk = pending_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    found.update(self._db.execute(
+                        f"SELECT key, score FROM clarity_scores WHERE key IN ({placeholders})", chunk
+                    ).fetchall())
+                for key, score in found.items():
+                    for i in pending.pop(key):
+                        results[i] = score
+                        self._counters["disk_hits"] += 1
+                    self._remember(key, score)
+
+            self._counters["misses"] += sum(len(indices) for indices in pending.values())
+            return results
+
+    def put_many(self, keys, scores, version):
+        """
+        Stores freshly computed scores in both tiers.
+        """
+        with self._lock:
+            rows = []
+            now = time.time()
+            for key, score in zip(keys, scores):
+                score = float(score)
+                self._remember(key, score)
+                rows.append((key, version, score, now))
+            if self._db is not None and rows:
+                self._db.executemany("INSERT OR REPLACE INTO clarity_scores VALUES (?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def purge_stale(self, version, older_than=STALE_AFTER):
+        """
+        Deletes persisted scores computed by any other model/tokenizer version
+        that were written more than ``older_than`` seconds ago. Recent rows are
+        kept, so versions sharing one file (e.g. during a rolling deploy) do
+        not delete each other's scores.
+        """
+        if self._db is None:
+            return 0
+        with self._lock:
+            deleted = self._db.execute(
+                "DELETE FROM clarity_scores WHERE version != ? AND written_at < ?", (version, time.time() - older_than)
+            ).rowcount
+            self._db.commit()
+            return deleted
+
+    def stats(self):
+        """
+        Returns hit/miss/eviction counters and the in-process entry count.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+            return stats
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
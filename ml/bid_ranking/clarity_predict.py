@@ -1,26 +1,145 @@
 import pickle
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+from clarity_cache import artifact_fingerprint
+from numpy_clarity import NumpyClarityModel
+from vocab_tokenizer import VocabTokenizer
+
+def pad_sequences(sequences, maxlen):
+    """
+    NumPy equivalent of Keras ``pad_sequences`` for post padding/truncation.
+    """
+    padded = np.zeros((len(sequences), maxlen), dtype=np.int32)
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[:maxlen]
+        padded[row, :len(sequence)] = sequence
+    return padded
+
+def masks_padding(model):
+    """
+    True if the model ignores padding ids (Embedding ``mask_zero=True``), in
+    which case trailing padding can be trimmed without changing its output.
+    """
+    if isinstance(model, NumpyClarityModel):
+        return model.mask_zero
+    return bool(getattr(model.layers[0], "mask_zero", False))
+
+def predict_bucketed(model, padded_sequences, buckets=4, batch_size=64):
+    """
+    Predicts clarity scores with length-sorted dynamic padding: rows are sorted
+    by token count, split into ``buckets`` equal-sized groups, and each group
+    is trimmed to its own longest row before the forward pass.
+
+    Only valid for models that mask padding (see ``masks_padding``); the
+    results then match the fixed-length output.
+
+    :param model: Keras model or ``NumpyClarityModel``.
+    :param padded_sequences: Post-padded int array of shape ``(n, max_length)``.
+    :param buckets: Number of length buckets.
+    :param batch_size: Rows per model batch.
+    :return: float32 array of ``n`` scores in input order.
+    """
+    lengths = np.count_nonzero(padded_sequences, axis=1)  # Post padding: ids are never 0
+    order = np.argsort(lengths, kind="stable")
+    scores = np.empty(len(padded_sequences), dtype=np.float32)
+    for bucket in np.array_split(order, min(buckets, len(order))):
+        width = max(int(lengths[bucket[-1]]), 1)  # Rows are sorted, so the last is longest
+        bucket_scores = model.predict(padded_sequences[bucket, :width], batch_size=batch_size, verbose=0)
+        scores[bucket] = bucket_scores.reshape(-1)
+    return scores
 
 class ClarityPredictor:
-    def __init__(self, model_path, tokenizer_path, max_length=20):
+    def __init__(self, model_path, tokenizer_path, max_length=20, batch_size=64, cache=None, buckets=1):
         """
         Initialize the ClarityPredictor by loading the model and tokenizer.
+        A ``.npz`` model path (see ``numpy_clarity.py``) runs the TensorFlow-free
+        NumPy engine; any other path is loaded with Keras. Likewise a ``.json``
+        tokenizer path (see ``vocab_tokenizer.py``) uses the compiled vocabulary
+        instead of the pickled Keras tokenizer.
+
+        An optional ``ClarityCache`` (see ``clarity_cache.py``) keeps scores
+        between calls; only cache misses are sent to the model. Its keys hash the
+        encoded token ids together with a fingerprint of the model and tokenizer
+        files, so publishing new artifacts invalidates old entries.
+
+        With ``buckets > 1`` and a model that masks padding, batches are scored
+        with length-sorted dynamic padding (see ``predict_bucketed``). Models
+        without padding masks always use fixed-length padding, because their
+        output depends on the padding.
         """
-        self.model = load_model(model_path)  # Load the trained model
-        with open(tokenizer_path, "rb") as f:
-            self.tokenizer = pickle.load(f)  # Load the tokenizer
+        if str(model_path).endswith(".npz"):
+            self.model = NumpyClarityModel(model_path)  # Load the exported weights
+        else:
+            from tensorflow.keras.models import load_model
+            self.model = load_model(model_path)  # Load the trained model
+        if str(tokenizer_path).endswith(".json"):
+            self.tokenizer = VocabTokenizer.load(tokenizer_path)  # Load the compiled vocabulary
+        else:
+            with open(tokenizer_path, "rb") as f:
+                self.tokenizer = pickle.load(f)  # Load the tokenizer
         self.max_length = max_length  # Maximum sequence length
+        self.batch_size = batch_size  # Default batch size for batched scoring
+        self.buckets = buckets if masks_padding(self.model) else 1
+        self.cache = cache
+        if cache is not None:
+            self.version = f"{artifact_fingerprint(model_path, tokenizer_path)}-{max_length}-ids"
+            cache.purge_stale(self.version)  # Drop old scores from previous artifacts
+
+    def encode(self, bids):
+        """
+        Tokenize and pad bid texts into an int32 ``(n, max_length)`` matrix.
+        """
+        if isinstance(self.tokenizer, VocabTokenizer):
+            return self.tokenizer.texts_to_padded(bids, max_length=self.max_length)
+        sequences = self.tokenizer.texts_to_sequences(bids)
+        return pad_sequences(sequences, maxlen=self.max_length)
 
     def predict_clarity_score(self, bid):
         """
         Predict the clarity score for a given freelancing bid paragraph.
         """
-        # Tokenize and pad the input bid
-        sequence = self.tokenizer.texts_to_sequences([bid])
-        padded_sequence = pad_sequences(sequence, maxlen=self.max_length, padding="post", truncating="post")
-        
-        # Predict the clarity score
-        score = self.model.predict(padded_sequence)[0][0]
-        return float(score)  # Convert to float
\ No newline at end of file
+        # Score through the batched path so single and batched results agree
+        return float(self.predict_clarity_scores([bid])[0])  # Convert to float
+
+    def predict_clarity_scores(self, bids, batch_size=None):
+        """
+        Predict clarity scores for many bid paragraphs with one forward pass.
+
+        :param bids: List or array of bid texts.
+        :param batch_size: Rows per model batch (defaults to ``self.batch_size``).
+        :return: float32 NumPy array of scores, in input order.
+        """
+        bids = [str(bid) for bid in bids]
+        if not bids:
+            return np.empty(0, dtype=np.float32)
+
+        if self.cache is None:
+            return self._score(bids, batch_size)
+
+        # Only send cache misses to the model
+        padded_sequences = self.encode(bids)
+        keys = [self.cache.key(row, self.version) for row in padded_sequences]
+        cached = self.cache.get_many(keys)
+        scores = np.array([np.nan if score is None else score for score in cached], dtype=np.float32)
+        misses = {}
+        for i, score in enumerate(cached):
+            if score is None:
+                misses.setdefault(keys[i], i)  # Score repeated texts once
+        if misses:
+            miss_scores = self._predict(padded_sequences[list(misses.values())], batch_size)
+            self.cache.put_many(list(misses), miss_scores, self.version)
+            scores_by_key = dict(zip(misses, miss_scores))
+            for i, score in enumerate(cached):
+                if score is None:
+                    scores[i] = scores_by_key[keys[i]]
+        return scores
+
+    def _score(self, bids, batch_size=None):
+        # Tokenize and pad all bids together
+        return self._predict(self.encode(bids), batch_size)
+
+    def _predict(self, padded_sequences, batch_size=None):
+        # Predict clarity scores for the whole batch
+        if self.buckets > 1:
+            return predict_bucketed(self.model, padded_sequences, self.buckets, batch_size or self.batch_size)
+        scores = self.model.predict(padded_sequences, batch_size=batch_size or self.batch_size, verbose=0)
+        return scores.reshape(-1).astype(np.float32)
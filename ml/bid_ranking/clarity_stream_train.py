@@ -0,0 +1,166 @@
+import argparse
+import pickle
+import time
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from tensorflow.keras.preprocessing.text import Tokenizer
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+
+
+def iter_bid_chunks(path, chunksize=10_000):
+    """
+    Streams ``(bid, clarity_score)`` rows from a CSV or JSONL file in chunks.
+
+    :param path: ``.csv`` or ``.jsonl`` file with ``bid`` and ``clarity_score`` columns.
+    :param chunksize: Rows per chunk.
+    :return: Iterator of DataFrames.
+    """
+    if str(path).endswith((".jsonl", ".json")):
+        reader = pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        reader = pd.read_csv(path, chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield chunk[["bid", "clarity_score"]].dropna()
+
+
+def fit_tokenizer(path, num_words=5000, chunksize=10_000):
+    """
+    Fits the Keras tokenizer in one streaming pass over the training file.
+
+    :return: ``(tokenizer, n_samples)``
+    """
+    tokenizer = Tokenizer(num_words=num_words, oov_token="<OOV>")
+    n_samples = 0
+    for chunk in iter_bid_chunks(path, chunksize):
+        tokenizer.fit_on_texts(chunk["bid"].astype(str))
+        n_samples += len(chunk)
+    return tokenizer, n_samples
+
+
+def make_dataset(path, tokenizer, max_length=20, batch_size=32, bucket_boundaries=(5, 10, 15),
+                 shuffle_buffer=10_000, chunksize=10_000, threads=None):
+    """
+    Builds a ``tf.data`` pipeline that streams bids from disk, batches them by
+    token length so each batch is only padded to its own longest bid, and
+    prefetches the next batches while the model trains.
+
+    :param bucket_boundaries: Sequence-length boundaries between buckets.
+    :param threads: Size of the pipeline's private thread pool (TF default if None).
+    """
+    def generate():
+        for chunk in iter_bid_chunks(path, chunksize):
+            sequences = tokenizer.texts_to_sequences(chunk["bid"].astype(str))
+            for sequence, score in zip(sequences, chunk["clarity_score"]):
+                if sequence:  # Bids with no tokens carry no signal
+                    yield np.asarray(sequence[:max_length], dtype=np.int32), np.float32(score)
+
+    dataset = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+            tf.TensorSpec(shape=(), dtype=tf.float32),
+        ),
+    )
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer)
+    dataset = dataset.bucket_by_sequence_length(
+        element_length_func=lambda sequence, score: tf.shape(sequence)[0],
+        bucket_boundaries=list(bucket_boundaries),
+        bucket_batch_sizes=[batch_size] * (len(bucket_boundaries) + 1),
+    )
+    options = tf.data.Options()
+    if threads:
+        options.threading.private_threadpool_size = threads
+    return dataset.with_options(options).prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(num_words=5000, embedding_dim=64):
+    """
+    Same architecture as ``bidding_clarity_train.py``, with the padding id
+    masked so predictions do not depend on how far a bid was padded.
+    """
+    model = Sequential([
+        Embedding(input_dim=num_words, output_dim=embedding_dim, mask_zero=True),
+        LSTM(64, return_sequences=False),
+        Dropout(0.2),
+        Dense(32, activation="relu"),
+        Dense(1)  # Regression output for clarity score
+    ])
+    model.compile(optimizer="adam", loss="mean_squared_error", metrics=["mae"])
+    return model
+
+
+class ThroughputLogger(tf.keras.callbacks.Callback):
+    """
+    Reports wall time and samples/sec for every epoch.
+    """
+
+    def __init__(self, n_samples):
+        super().__init__()
+        self.n_samples = n_samples
+        self.history = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        seconds = time.perf_counter() - self._start
+        self.history.append({"epoch": epoch + 1, "seconds": seconds, "samples_per_sec": self.n_samples / seconds})
+        print(f"Epoch {epoch + 1}: {seconds:.2f}s, {self.n_samples / seconds:,.0f} samples/sec")
+
+
+def train_streaming(data_path, model_path="clarity_score_model.h5", tokenizer_path="tokenizer.pkl",
+                    validation_path=None, epochs=10, batch_size=32, max_length=20, num_words=5000,
+                    bucket_boundaries=(5, 10, 15), chunksize=10_000, threads=None):
+    """
+    Trains the clarity model from a CSV/JSONL file on disk and writes the model
+    and tokenizer artifacts that ``ClarityPredictor`` loads.
+
+    :return: Per-epoch throughput history.
+    """
+    if threads:
+        tf.config.threading.set_inter_op_parallelism_threads(threads)
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+
+    tokenizer, n_samples = fit_tokenizer(data_path, num_words, chunksize)
+    print(f"Tokenizer fitted on {n_samples} bids ({len(tokenizer.word_index)} words)")
+
+    pipeline = dict(tokenizer=tokenizer, max_length=max_length, batch_size=batch_size,
+                    bucket_boundaries=bucket_boundaries, chunksize=chunksize, threads=threads)
+    train_data = make_dataset(data_path, **pipeline)
+    validation_data = make_dataset(validation_path, shuffle_buffer=0, **pipeline) if validation_path else None
+
+    model = build_model(num_words)
+    throughput = ThroughputLogger(n_samples)
+    model.fit(train_data, validation_data=validation_data, epochs=epochs, callbacks=[throughput])
+
+    model.save(model_path)
+    with open(tokenizer_path, "wb") as f:
+        pickle.dump(tokenizer, f)
+    print(f"Model saved as '{model_path}', tokenizer saved as '{tokenizer_path}'")
+    return throughput.history
+
+
+# Example usage: python clarity_stream_train.py bids.jsonl --epochs 20 --batch-size 256
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream-train the clarity model from a CSV or JSONL file.")
+    parser.add_argument("data_path", help="Training file with 'bid' and 'clarity_score' columns")
+    parser.add_argument("--validation-path", default=None)
+    parser.add_argument("--model-path", default="clarity_score_model.h5")
+    parser.add_argument("--tokenizer-path", default="tokenizer.pkl")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=20)
+    parser.add_argument("--bucket-boundaries", type=int, nargs="+", default=[5, 10, 15])
+    parser.add_argument("--chunksize", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    train_streaming(
+        args.data_path, args.model_path, args.tokenizer_path, args.validation_path,
+        epochs=args.epochs, batch_size=args.batch_size, max_length=args.max_length,
+        bucket_boundaries=args.bucket_boundaries, chunksize=args.chunksize, threads=args.threads,
+    )
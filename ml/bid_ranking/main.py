@@ -1,17 +1,25 @@
+import os
 import joblib
 import numpy as np
+import pandas as pd
+from clarity_cache import ClarityCache
 from clarity_predict import ClarityPredictor  # Assuming this is your package
+from model_registry import ModelRegistry
 
 # Paths to the pre-trained models
 DL_MODEL_PATH = "clarity_score_model.h5"   # Path to deep learning model
 TOKENIZER_PATH = "tokenizer.pkl"     # Path to tokenizer
 LR_MODEL_PATH = "bid_ranking_model.pkl"  # Path to linear regression model
+CLARITY_CACHE_PATH = os.environ.get("CLARITY_CACHE_PATH")  # Opt-in persistent clarity score cache (unset = memory only)
 
-# Load the deep learning-based clarity predictor
-clarity_model = ClarityPredictor(DL_MODEL_PATH, TOKENIZER_PATH)
-
-# Load the regression model
-regression_model = joblib.load(LR_MODEL_PATH)
+# Models are loaded lazily on first use so importing this module stays cheap.
+# "clarity_model" covers the clarity network and its tokenizer, which
+# ClarityPredictor loads together.
+registry = ModelRegistry()
+registry.register("clarity_model", lambda: ClarityPredictor(
+    DL_MODEL_PATH, TOKENIZER_PATH, cache=ClarityCache(CLARITY_CACHE_PATH)
+))
+registry.register("regression_model", lambda: joblib.load(LR_MODEL_PATH))
 
 # Function to predict bid rank
 def predict_bid_rank(bid_text, experience, price, reputation):
@@ -25,15 +33,88 @@ def predict_bid_rank(bid_text, experience, price, reputation):
     :return: Predicted bid rank.
     """
     # Get clarity score from deep learning model
-    clarity_score = clarity_model.predict_clarity_score(bid_text)
+    clarity_score = registry.get("clarity_model").predict_clarity_score(bid_text)
 
     # Prepare input for regression model
     features = np.array([[clarity_score, experience, price, reputation]])
 
     # Predict bid rank
-    bid_rank = regression_model.predict(features)[0]
+    bid_rank = registry.get("regression_model").predict(features)[0]
     return bid_rank
 
+# Function to score many bids in input order
+def score_bids(bid_texts, experience, price, reputation, batch_size=64):
+    """
+    Predicts clarity scores and bid ranks for many bids, one model call per stage.
+
+    :param bid_texts: Sequence of bid texts.
+    :param experience: Array-like of experience levels (years).
+    :param price: Array-like of bid prices ($).
+    :param reputation: Array-like of reputation scores (1-10).
+    :param batch_size: Batch size for clarity scoring.
+    :return: ``(clarity_scores, bid_ranks)`` NumPy arrays in input order.
+    """
+    # Score clarity for all bids in batches
+    clarity_scores = registry.get("clarity_model").predict_clarity_scores(bid_texts, batch_size=batch_size)
+    if len(clarity_scores) == 0:
+        return clarity_scores, np.empty(0)
+
+    # Run the regression model once over the whole feature matrix
+    features = np.column_stack([
+        clarity_scores,
+        np.asarray(experience, dtype=float),
+        np.asarray(price, dtype=float),
+        np.asarray(reputation, dtype=float),
+    ])
+    return clarity_scores, registry.get("regression_model").predict(features)
+
+# Function to rank every bid on one or more jobs
+def rank_bids(bids, top_k=None, batch_size=64):
+    """
+    Scores and ranks many bids at once, one model call per stage.
+
+    :param bids: DataFrame (or dict of column arrays) with ``bid_text``,
+                 ``experience``, ``price`` and ``reputation`` columns and an
+                 optional ``job_id`` column (all bids share one job if absent).
+    :param top_k: If given, keep only the best ``top_k`` bids of each job.
+    :param batch_size: Batch size for clarity scoring.
+    :return: DataFrame with ``clarity_score``, ``bid_rank`` (predicted rank
+             score) and ``position`` (1 = best within its job), sorted by job
+             and position.
+    """
+    bids = pd.DataFrame(bids).reset_index(drop=True)
+    if "job_id" not in bids.columns:
+        bids["job_id"] = 0
+
+    bids["clarity_score"], bids["bid_rank"] = score_bids(
+        bids["bid_text"].tolist(), bids["experience"], bids["price"], bids["reputation"], batch_size=batch_size
+    )
+
+    # Rank bids within each job (higher predicted rank score is better)
+    bids["position"] = bids.groupby("job_id")["bid_rank"].rank(ascending=False, method="first").astype(int)
+    ranked = bids.sort_values(["job_id", "position"], kind="stable")
+    if top_k is not None:
+        ranked = ranked[ranked["position"] <= top_k]
+    return ranked.reset_index(drop=True)
+
+# Warm-up: load every model and run a dummy batch through the full pipeline
+def warmup(batch_size=8):
+    """
+    Loads all models and scores a dummy batch so the first real request does
+    not pay for loading or graph tracing.
+
+    :param batch_size: Number of dummy bids to score.
+    :return: Per-artifact load stats (seconds and RSS delta in bytes).
+    """
+    registry.load_all()
+    rank_bids({
+        "bid_text": ["I can deliver a high-quality website on time."] * batch_size,
+        "experience": np.ones(batch_size),
+        "price": np.full(batch_size, 100.0),
+        "reputation": np.full(batch_size, 5.0),
+    }, batch_size=batch_size)
+    return registry.stats()
+
 # Example usage
 if __name__ == "__main__":
     bid_text = "I have 5 years of experience in web development and can deliver a high-quality website."
@@ -43,3 +124,13 @@ if __name__ == "__main__":
 
     predicted_rank = predict_bid_rank(bid_text, experience, price, reputation)
     print(f"Predicted Bid Rank: {predicted_rank:.2f}")
+
+    # Rank all bids on a job in one pass
+    job_bids = pd.DataFrame({
+        "job_id": [1, 1, 1],
+        "bid_text": [bid_text, "I can do the job quickly. Hire me!", "I am a new freelancer eager to learn."],
+        "experience": [5, 2, 0],
+        "price": [500, 300, 150],
+        "reputation": [8, 6, 4],
+    })
+    print(rank_bids(job_bids, top_k=2)[["job_id", "position", "bid_rank", "bid_text"]])
@@ -0,0 +1,80 @@
+import resource
+import sys
+import threading
+import time
+
+
+def current_rss_bytes():
+    """
+    Returns the resident set size of this process in bytes (peak RSS where
+    the current value is unavailable).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # kB on Linux
+
+
+class ModelRegistry:
+    """
+    Thread-safe registry that loads each model artifact lazily on first use
+    and records how long it took and how much memory it added.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._artifacts = {}
+        self._locks = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, loader):
+        """
+        Registers an artifact without loading it.
+
+        :param name: Artifact name used with ``get``.
+        :param loader: Zero-argument callable that loads the artifact.
+        """
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+            self._artifacts.pop(name, None)
+            self._stats.pop(name, None)
+
+    def get(self, name):
+        """
+        Returns the artifact, loading it on first use. Concurrent callers wait
+        for a single load instead of loading it twice.
+        """
+        if name in self._artifacts:
+            return self._artifacts[name]
+        with self._locks[name]:
+            if name not in self._artifacts:
+                rss_before = current_rss_bytes()
+                start = time.perf_counter()
+                artifact = self._loaders[name]()
+                self._stats[name] = {
+                    "load_seconds": time.perf_counter() - start,
+                    "rss_delta_bytes": current_rss_bytes() - rss_before,
+                }
+                self._artifacts[name] = artifact
+        return self._artifacts[name]
+
+    def is_loaded(self, name):
+        return name in self._artifacts
+
+    def load_all(self):
+        """
+        Loads every registered artifact that is not loaded yet.
+        """
+        for name in list(self._loaders):
+            self.get(name)
+
+    def stats(self):
+        """
+        Returns ``{name: {"load_seconds": ..., "rss_delta_bytes": ...}}`` for
+        the artifacts loaded so far.
+        """
+        return {name: dict(stats) for name, stats in self._stats.items()}
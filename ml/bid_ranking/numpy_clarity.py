@@ -0,0 +1,137 @@
+import argparse
+import numpy as np
+
+# Activations supported by the exported Dense layers
+DENSE_ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+}
+
+# Maximum absolute difference from Keras observed on clarity scores (1-10 scale).
+# Both paths run in float32; the gap comes from different summation order.
+KERAS_TOLERANCE = 1e-4
+
+
+def _sigmoid(x):
+    # tanh form is overflow-free for large negative inputs
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def export_clarity_weights(model_path, npz_path):
+    """
+    Exports the Embedding -> LSTM -> Dense weights of a trained Keras clarity
+    model (as saved by ``bidding_clarity_train.py``) to a plain ``.npz`` file.
+
+    :param model_path: Path to the Keras ``.h5`` / ``.keras`` model.
+    :param npz_path: Destination ``.npz`` path.
+    """
+    from tensorflow.keras.models import load_model  # only needed for export
+
+    model = load_model(model_path)
+    arrays = {}
+    dense_activations = []
+    mask_zero = False
+    for layer in model.layers:
+        kind = type(layer).__name__
+        weights = layer.get_weights()
+        if kind == "Embedding":
+            arrays["embeddings"] = weights[0]
+            mask_zero = bool(getattr(layer, "mask_zero", False))
+        elif kind == "LSTM":
+            if layer.activation.__name__ != "tanh" or layer.recurrent_activation.__name__ != "sigmoid":
+                raise ValueError("Only tanh/sigmoid LSTM layers are supported by the NumPy engine")
+            arrays["lstm_kernel"], arrays["lstm_recurrent_kernel"], arrays["lstm_bias"] = weights
+        elif kind == "Dense":
+            activation = layer.activation.__name__
+            if activation not in DENSE_ACTIVATIONS:
+                raise ValueError(f"Unsupported Dense activation: {activation}")
+            index = len(dense_activations)
+            arrays[f"dense_{index}_kernel"], arrays[f"dense_{index}_bias"] = weights
+            dense_activations.append(activation)
+        elif kind != "Dropout":  # Dropout is a no-op at inference
+            raise ValueError(f"Unsupported layer for the NumPy engine: {kind}")
+
+    arrays = {name: np.asarray(value, dtype=np.float32) for name, value in arrays.items()}
+    np.savez(npz_path, dense_activations=np.array(dense_activations), mask_zero=np.array(mask_zero), **arrays)
+
+
+class NumpyClarityModel:
+    """
+    Pure-NumPy forward pass of the clarity model, a drop-in replacement for the
+    Keras model's ``predict``. Outputs match Keras within ``KERAS_TOLERANCE``.
+    """
+
+    def __init__(self, npz_path):
+        with np.load(npz_path) as weights:
+            self.embeddings = weights["embeddings"]
+            # Masked models skip padding (id 0) steps, as Keras does with mask_zero=True
+            self.mask_zero = bool(weights["mask_zero"]) if "mask_zero" in weights else False
+            self.lstm_kernel = weights["lstm_kernel"]
+            self.lstm_recurrent_kernel = weights["lstm_recurrent_kernel"]
+            self.lstm_bias = weights["lstm_bias"]
+            self.dense_layers = [
+                (weights[f"dense_{i}_kernel"], weights[f"dense_{i}_bias"], DENSE_ACTIVATIONS[str(activation)])
+                for i, activation in enumerate(weights["dense_activations"])
+            ]
+        self.units = self.lstm_recurrent_kernel.shape[0]
+
+    def _forward(self, padded_sequences):
+        units = self.units
+        batch, steps = padded_sequences.shape
+
+        # Project every timestep's embedding through the input kernel at once
+        inputs = self.embeddings[padded_sequences] @ self.lstm_kernel + self.lstm_bias
+
+        # LSTM recurrence (Keras gate order: input, forget, cell, output)
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        for t in range(steps):
+            z = inputs[:, t] + h @ self.lstm_recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c_next = f * c + i * g
+            h_next = o * np.tanh(c_next)
+            if self.mask_zero:
+                step = (padded_sequences[:, t] != 0)[:, None]
+                c = np.where(step, c_next, c)
+                h = np.where(step, h_next, h)
+            else:
+                c, h = c_next, h_next
+
+        # Dense head
+        x = h
+        for kernel, bias, activation in self.dense_layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+    def predict(self, padded_sequences, batch_size=None, verbose=0):
+        """
+        Predicts clarity scores for an ``(n, max_length)`` array of token ids.
+
+        :param padded_sequences: Integer array of padded token ids.
+        :param batch_size: Rows per forward pass (all rows at once if None).
+        :param verbose: Ignored; kept for Keras ``predict`` compatibility.
+        :return: float32 array of shape ``(n, 1)``.
+        """
+        padded_sequences = np.asarray(padded_sequences, dtype=np.int64)
+        n = len(padded_sequences)
+        if n == 0:
+            return np.empty((0, 1), dtype=np.float32)
+        batch_size = batch_size or n
+        return np.concatenate([
+            self._forward(padded_sequences[start:start + batch_size])
+            for start in range(0, n, batch_size)
+        ])
+
+
+# Example usage: python numpy_clarity.py clarity_score_model.h5 clarity_score_model.npz
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the clarity model weights to a NumPy .npz file.")
+    parser.add_argument("model_path", help="Trained Keras clarity model (.h5)")
+    parser.add_argument("npz_path", help="Output .npz path")
+    args = parser.parse_args()
+
+    export_clarity_weights(args.model_path, args.npz_path)
+    print(f"Weights exported to '{args.npz_path}'")
@@ -0,0 +1,155 @@
+import asyncio
+import time
+from collections import deque
+import numpy as np
+
+
+class BidScoringService:
+    """
+    Asyncio micro-batching front end for the bid ranker.
+
+    Concurrent ``submit`` calls are queued and flushed as one batch when
+    ``max_batch_size`` requests are waiting or ``max_delay_ms`` has passed since
+    the first request of the batch arrived. Each batch is scored with a single
+    call to ``score_fn`` in a worker thread, so the event loop stays responsive.
+    """
+
+    def __init__(self, score_fn=None, max_batch_size=64, max_delay_ms=5.0, max_queue_depth=1024):
+        """
+        :param score_fn: Callable ``(bid_texts, experience, price, reputation)``
+                         returning ``(clarity_scores, bid_ranks)``; defaults to
+                         ``main.score_bids``.
+        :param max_batch_size: Largest batch sent to the models.
+        :param max_delay_ms: Longest time a request waits for its batch to fill.
+        :param max_queue_depth: Requests allowed to wait before ``submit``
+                                applies backpressure.
+        """
+        if score_fn is None:
+            from main import score_bids as score_fn
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.max_queue_depth = max_queue_depth
+        self._queue = None
+        self._worker = None
+        self._latencies = deque(maxlen=10000)  # Recent request latencies (seconds)
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "batches": 0}
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Scores every request already queued, then stops the batching loop.
+        """
+        if self._worker is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def submit(self, bid_text, experience, price, reputation, wait=True):
+        """
+        Queues one bid and waits for its score.
+
+        :param wait: If True, wait for queue space when the queue is full;
+                     otherwise raise ``asyncio.QueueFull`` immediately.
+        :return: ``(clarity_score, bid_rank)`` for this bid.
+        """
+        if self._worker is None:
+            raise RuntimeError("BidScoringService is not running; call start() first")
+        future = asyncio.get_running_loop().create_future()
+        item = (bid_text, experience, price, reputation, future, time.perf_counter())
+        if wait:
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self._counters["rejected"] += 1
+                raise
+        self._counters["submitted"] += 1
+        return await future
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            bid_texts, experience, price, reputation, futures, started = zip(*batch)
+            try:
+                clarity_scores, bid_ranks = await loop.run_in_executor(
+                    None, self.score_fn, list(bid_texts), experience, price, reputation
+                )
+            except Exception as error:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+                self._counters["failed"] += len(batch)
+            else:
+                finished = time.perf_counter()
+                for future, clarity, rank, start in zip(futures, clarity_scores, bid_ranks, started):
+                    if not future.done():  # The caller may have been cancelled
+                        future.set_result((float(clarity), float(rank)))
+                    self._latencies.append(finished - start)
+                self._counters["completed"] += len(batch)
+            self._counters["batches"] += 1
+            for _ in batch:
+                self._queue.task_done()
+
+    def stats(self):
+        """
+        Returns counters, current queue depth, mean batch size and latency
+        percentiles (milliseconds) over recent requests.
+        """
+        stats = dict(self._counters)
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        scored = stats["completed"] + stats["failed"]
+        stats["mean_batch_size"] = scored / stats["batches"] if stats["batches"] else 0.0
+        if self._latencies:
+            p50, p95, p99 = np.percentile(np.fromiter(self._latencies, dtype=float), [50, 95, 99]) * 1000
+            stats.update(latency_p50_ms=float(p50), latency_p95_ms=float(p95), latency_p99_ms=float(p99))
+        return stats
+
+
+# Example usage: 500 concurrent requests against the local models
+if __name__ == "__main__":
+    from main import warmup
+
+    async def demo():
+        async with BidScoringService() as service:
+            results = await asyncio.gather(*(
+                service.submit("I can deliver a high-quality website on time.", i % 10, 100 + i, 1 + i % 10)
+                for i in range(500)
+            ))
+            print(f"Scored {len(results)} bids, first: {results[0]}")
+            print(service.stats())
+
+    warmup()  # Load models before serving so the first batch isn't slow
+    asyncio.run(demo())
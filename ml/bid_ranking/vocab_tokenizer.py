@@ -0,0 +1,136 @@
+import argparse
+import json
+import pickle
+from itertools import repeat
+import numpy as np
+
+
+def export_vocabulary(tokenizer_path, vocab_path):
+    """
+    Exports a pickled Keras ``Tokenizer`` (as saved by
+    ``bidding_clarity_train.py``) to a compact JSON vocabulary. The
+    ``num_words`` cut-off and OOV handling are baked into the exported ids.
+
+    :param tokenizer_path: Path to ``tokenizer.pkl``.
+    :param vocab_path: Destination ``.json`` path.
+    """
+    with open(tokenizer_path, "rb") as f:
+        tokenizer = pickle.load(f)
+    if tokenizer.char_level or getattr(tokenizer, "analyzer", None) is not None:
+        raise ValueError("Only word-level tokenizers without a custom analyzer can be exported")
+
+    num_words = tokenizer.num_words
+    oov_id = tokenizer.word_index.get(tokenizer.oov_token)
+    vocabulary = {}
+    for word, index in tokenizer.word_index.items():
+        if num_words and index >= num_words:
+            if oov_id is None:
+                continue  # Keras drops out-of-range words when there is no OOV token
+            index = oov_id
+        vocabulary[word] = index
+
+    artifact = {
+        "filters": tokenizer.filters,
+        "lower": tokenizer.lower,
+        "split": tokenizer.split,
+        "num_words": num_words,
+        "oov_id": oov_id,
+        "vocabulary": vocabulary,
+    }
+    with open(vocab_path, "w") as f:
+        json.dump(artifact, f, separators=(",", ":"))
+
+
+class VocabTokenizer:
+    """
+    Frozen-vocabulary tokenizer that reproduces Keras ``texts_to_sequences``
+    followed by post-padding/post-truncation, writing a whole batch straight
+    into an int32 padded matrix.
+    """
+
+    def __init__(self, vocabulary, filters, lower=True, split=" ", oov_id=None, num_words=None):
+        self.vocabulary = dict(vocabulary)
+        self.filters = filters
+        self.lower = lower
+        self.split = split
+        self.oov_id = oov_id
+        self.num_words = num_words
+        self._translate_map = str.maketrans({c: split for c in filters})
+        self._missing_id = -1 if oov_id is None else oov_id  # -1 marks dropped words
+
+    @classmethod
+    def load(cls, vocab_path):
+        with open(vocab_path) as f:
+            return cls(**json.load(f))
+
+    def _words(self, text):
+        if self.lower:
+            text = text.lower()
+        return [word for word in text.translate(self._translate_map).split(self.split) if word]
+
+    def texts_to_ids(self, texts):
+        """
+        Tokenizes a batch into one flat id array.
+
+        :param texts: Iterable of strings.
+        :return: ``(ids, lengths)`` where ``ids`` is a flat int32 array of all
+                 token ids and ``lengths`` holds the token count of each text.
+        """
+        words = []
+        counts = []
+        for text in texts:
+            text_words = self._words(text)
+            words.extend(text_words)
+            counts.append(len(text_words))
+        lengths = np.array(counts, dtype=np.int64)
+
+        lookup = self.vocabulary.get
+        ids = np.fromiter(map(lookup, words, repeat(self._missing_id)), dtype=np.int32, count=len(words))
+        if self.oov_id is None:
+            keep = ids >= 0
+            if not keep.all():
+                rows = np.repeat(np.arange(len(lengths)), lengths)
+                lengths = np.bincount(rows[keep], minlength=len(lengths)).astype(np.int64)
+                ids = ids[keep]
+        return ids, lengths
+
+    def texts_to_sequences(self, texts):
+        """
+        Keras-compatible list-of-lists output.
+        """
+        ids, lengths = self.texts_to_ids(texts)
+        return [chunk.tolist() for chunk in np.split(ids, np.cumsum(lengths)[:-1])] if len(lengths) else []
+
+    def texts_to_padded(self, texts, max_length=20, out=None):
+        """
+        Tokenizes a batch and fills a padded id matrix in one pass.
+
+        :param texts: Iterable of strings.
+        :param max_length: Sequences are post-padded/post-truncated to this length.
+        :param out: Optional preallocated int32 array of shape ``(n, max_length)``.
+        :return: int32 array of shape ``(n, max_length)``.
+        """
+        ids, lengths = self.texts_to_ids(texts)
+        n = len(lengths)
+        if out is None:
+            out = np.zeros((n, max_length), dtype=np.int32)
+        else:
+            out[:] = 0
+
+        # Row and column of every token, then drop tokens past max_length
+        rows = np.repeat(np.arange(n), lengths)
+        cols = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        keep = cols < max_length
+        out[rows[keep], cols[keep]] = ids[keep]
+        return out
+
+
+# Example usage: python vocab_tokenizer.py tokenizer.pkl tokenizer_vocab.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a pickled Keras tokenizer to a compact JSON vocabulary.")
+    parser.add_argument("tokenizer_path", help="Pickled Keras tokenizer (.pkl)")
+    parser.add_argument("vocab_path", help="Output .json path")
+    args = parser.parse_args()
+
+    export_vocabulary(args.tokenizer_path, args.vocab_path)
+    print(f"Vocabulary exported to '{args.vocab_path}'")
@@ -0,0 +1,176 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+
+_data = None  # (features, labels, cluster_sizes, block_columns), set once per worker process
+
+
+def _init_worker(features, labels, block_columns):
+    global _data
+    n_clusters = int(labels.max()) + 1
+    _data = (features, labels, np.bincount(labels, minlength=n_clusters), block_columns)
+
+
+def _cluster_distance_sums(rows):
+    """
+    Sum of distances from each of ``rows`` to every point of each cluster,
+    streaming the pairwise distances one block of columns at a time.
+    """
+    features, labels, cluster_sizes, block_columns = _data
+    points = features[rows]
+    point_norms = (points ** 2).sum(axis=1)[:, None]
+    sums = np.zeros((len(rows), len(cluster_sizes)))
+    for start in range(0, len(features), block_columns):
+        block = features[start:start + block_columns]
+        squared = point_norms - 2 * points @ block.T + (block ** 2).sum(axis=1)
+        distances = np.sqrt(np.maximum(squared, 0))
+        one_hot = np.zeros((len(block), len(cluster_sizes)))
+        one_hot[np.arange(len(block)), labels[start:start + block_columns]] = 1
+        sums += distances @ one_hot
+    return sums
+
+
+def _silhouette_rows(rows):
+    """
+    Exact silhouette of each of ``rows`` against the full data set (same
+    definition as ``sklearn.metrics.silhouette_samples``; 0 in singleton clusters).
+    """
+    _, labels, cluster_sizes, _ = _data
+    sums = _cluster_distance_sums(rows)
+    own = labels[rows]
+    own_sizes = cluster_sizes[own]
+    a = sums[np.arange(len(rows)), own] / np.maximum(own_sizes - 1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_to_other = sums / cluster_sizes
+    mean_to_other[np.arange(len(rows)), own] = np.inf
+    mean_to_other[:, cluster_sizes == 0] = np.inf
+    b = mean_to_other.min(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (b - a) / np.maximum(a, b)
+    return np.where((own_sizes > 1) & np.isfinite(scores), scores, 0.0)
+
+
+def silhouette_samples_chunked(features, labels, rows=None, memory_mb=256, workers=1):
+    """
+    Exact per-point silhouettes without materializing the n x n distance matrix.
+
+    Rows are split into blocks that are scored in a process pool. Each block
+    streams the distances to the data in column blocks sized so that the
+    temporary distance block stays under ``memory_mb`` per worker.
+
+    :param features: ``(n, n_features)`` array.
+    :param labels: ``(n,)`` integer cluster labels.
+    :param rows: Indices to score (default: every point).
+    :return: Silhouettes aligned to ``rows``.
+    """
+    features = np.ascontiguousarray(features, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+    rows = np.arange(len(features)) if rows is None else np.asarray(rows)
+    # Temporaries per block: a few (block_rows x block_columns) float64 arrays
+    cells = max(int(memory_mb * 2 ** 20 / (8 * 4)), 1)
+    block_rows = int(min(len(rows), max(64, cells // max(len(features), 1)), 4096)) or 1
+    block_columns = max(cells // block_rows, 1)
+    blocks = [rows[start:start + block_rows] for start in range(0, len(rows), block_rows)]
+
+    if workers == 1:
+        _init_worker(features, labels, block_columns)
+        results = [_silhouette_rows(block) for block in blocks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(features, labels, block_columns)) as pool:
+            results = list(pool.map(_silhouette_rows, blocks))
+    return np.concatenate(results) if results else np.empty(0)
+
+
+def silhouette_exact(features, labels, memory_mb=256, workers=1):
+    """
+    Exact mean silhouette (equal to ``sklearn.metrics.silhouette_score``) in
+    O(n^2) time but bounded memory, spread over ``workers`` processes.
+    """
+    return float(silhouette_samples_chunked(features, labels, memory_mb=memory_mb, workers=workers).mean())
+
+
+def stratified_sample(labels, sample_size, random_state=0, min_per_cluster=2):
+    """
+    Sample indices allocated to clusters in proportion to their size (at
+    least ``min_per_cluster`` from each, when available).
+
+    :return: ``(indices, strata)`` where ``strata`` maps label -> (population, sampled indices).
+    """
+    rng = np.random.default_rng(random_state)
+    labels = np.asarray(labels)
+    n = len(labels)
+    strata = {}
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        take = min(len(members), max(min_per_cluster, round(sample_size * len(members) / n)))
+        strata[int(label)] = (len(members), rng.choice(members, size=take, replace=False))
+    indices = np.concatenate([sampled for _, sampled in strata.values()])
+    return indices, strata
+
+
+def silhouette_sampled(features, labels, sample_size=10_000, confidence=0.95, random_state=0, memory_mb=256,
+                       workers=1):
+    """
+    Estimates the mean silhouette from a stratified sample of points, each
+    scored exactly against the full data set, in O(sample_size * n).
+
+    :return: Dict with the estimate, a normal-approximation confidence
+             interval (stratified variance with finite-population correction),
+             the standard error, the sample size and the seconds taken.
+    """
+    start = time.perf_counter()
+    labels = np.asarray(labels, dtype=np.int64)
+    n = len(labels)
+    indices, strata = stratified_sample(labels, sample_size, random_state)
+    scores = silhouette_samples_chunked(features, labels, indices, memory_mb=memory_mb, workers=workers)
+
+    estimate = variance = 0.0
+    offset = 0
+    for population, sampled in strata.values():
+        stratum_scores = scores[offset:offset + len(sampled)]
+        offset += len(sampled)
+        weight = population / n
+        estimate += weight * stratum_scores.mean()
+        if len(sampled) > 1:
+            correction = 1 - len(sampled) / population
+            variance += weight ** 2 * stratum_scores.var(ddof=1) / len(sampled) * correction
+    std_error = float(np.sqrt(variance))
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return {
+        "silhouette": float(estimate), "ci_low": float(estimate - z * std_error),
+        "ci_high": float(estimate + z * std_error), "std_error": std_error, "confidence": confidence,
+        "sample_size": int(len(indices)), "seconds": time.perf_counter() - start,
+    }
+
+
+# Example usage: python cluster_quality.py learning_styles.csv --sample-size 20000 --workers 8
+if __name__ == "__main__":
+    import pandas as pd
+    from feature_store import FEATURE_COLUMNS
+
+    parser = argparse.ArgumentParser(description="Silhouette of a learning-style clustering (sampled or exact).")
+    parser.add_argument("clusters_path", help="CSV from stream_clustering.py (feature columns + learning_style)")
+    parser.add_argument("--sample-size", type=int, default=10_000)
+    parser.add_argument("--exact", action="store_true", help="Score every student (O(n^2) time)")
+    parser.add_argument("--memory-mb", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    clusters = pd.read_csv(args.clusters_path)
+    # Same standardization the clustering was trained on
+    features = clusters[FEATURE_COLUMNS].to_numpy()
+    features = (features - features.mean(axis=0)) / np.where(features.std(axis=0) > 0, features.std(axis=0), 1.0)
+    labels = clusters["learning_style"].to_numpy()
+    if args.exact:
+        start = time.perf_counter()
+        score = silhouette_exact(features, labels, args.memory_mb, args.workers)
+        print(f"Silhouette Score (exact): {score:.4f} in {time.perf_counter() - start:.2f}s")
+    else:
+        result = silhouette_sampled(features, labels, args.sample_size, memory_mb=args.memory_mb, workers=args.workers)
+        print(f"Silhouette Score: {result['silhouette']:.4f} "
+              f"({result['confidence']:.0%} CI {result['ci_low']:.4f} to {result['ci_high']:.4f}, "
+              f"n={result['sample_size']:,}, {result['seconds']:.2f}s)")
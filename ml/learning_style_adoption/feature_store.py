@@ -0,0 +1,257 @@
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = ["student", "topic", "clicks", "time_spent", "score"]
+METRICS = {"clicks": "clicks", "time_spent": "time", "score": "score"}  # Event column -> feature prefix
+FEATURE_COLUMNS = ["clicks_mean", "clicks_std", "time_mean", "time_std", "score_mean", "score_std"]
+
+
+class _ByteRange(io.RawIOBase):
+    # Read-only view of bytes ``start:stop`` of a file
+    def __init__(self, path, start, stop):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = stop - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= size
+        return size
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def split_input(path, parts):
+    """
+    Splits an event file into up to ``parts`` independent pieces that can be
+    parsed in parallel: ranges of row groups for Parquet, line-aligned byte
+    ranges (after the header) for CSV. CSV splitting assumes no quoted field
+    contains a newline, which holds for the numeric behavior logs.
+
+    :return: List of ``(start, stop)`` pieces for ``iter_behavior_chunks``.
+    """
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        bounds = np.linspace(0, pq.ParquetFile(path).num_row_groups, parts + 1).astype(int)
+    else:
+        with open(path, "rb") as file:
+            file.readline()  # Header
+            data_start, size = file.tell(), os.fstat(file.fileno()).st_size
+            bounds = [data_start]
+            for target in np.linspace(data_start, size, parts + 1)[1:-1].astype(int):
+                file.seek(max(target - 1, bounds[-1]))
+                file.readline()  # Move to the start of the next line
+                bounds.append(min(file.tell(), size))
+            bounds.append(size)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def iter_behavior_chunks(path, chunksize=1_000_000, part=None):
+    """
+    Streams behavior events from a CSV or Parquet file in bounded-memory chunks.
+
+    :param path: ``.csv`` or ``.parquet`` file with student, topic, clicks, time_spent and score columns.
+    :param chunksize: Rows per chunk.
+    :param part: Optional ``(start, stop)`` piece from ``split_input`` to read instead of the whole file.
+    :return: Iterator of DataFrames.
+    """
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        row_groups = None if part is None else list(range(*part))
+        for batch in parquet_file.iter_batches(batch_size=chunksize, row_groups=row_groups, columns=EVENT_COLUMNS):
+            yield batch.to_pandas()
+    elif part is None:
+        with pd.read_csv(path, usecols=EVENT_COLUMNS, chunksize=chunksize) as reader:
+            yield from reader
+    else:
+        header = pd.read_csv(path, nrows=0).columns.tolist()
+        with io.BufferedReader(_ByteRange(path, *part)) as file:
+            with pd.read_csv(file, header=None, names=header, usecols=EVENT_COLUMNS, chunksize=chunksize) as reader:
+                yield from reader
+
+
+class StudentFeatureStore:
+    """
+    Running per-student count / mean / M2 (sum of squared deviations) of each
+    behavior metric, maintained with Welford's algorithm.
+
+    Single events update in O(1). Batches are reduced per student with
+    ``np.bincount`` and combined with Chan et al.'s parallel formula, the same
+    one ``merge`` uses to combine stores built by different workers. Exported
+    features match ``df.groupby("student").agg(["mean", "std"])`` (ddof=1).
+    """
+
+    def __init__(self, capacity=1024):
+        self.student_index = {}  # student id -> row
+        self.students = []
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros((capacity, len(METRICS)))
+        self.m2 = np.zeros((capacity, len(METRICS)))
+
+    def __len__(self):
+        return len(self.students)
+
+    def _grow(self, rows):
+        capacity = len(self.count)
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, 2 * capacity)
+        self.count = np.concatenate([self.count, np.zeros(new_capacity - capacity, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros((new_capacity - capacity, len(METRICS)))])
+        self.m2 = np.concatenate([self.m2, np.zeros((new_capacity - capacity, len(METRICS)))])
+
+    def _rows(self, students):
+        # Only unique ids go through the Python dict
+        unique_students, inverse = np.unique(np.asarray(students), return_inverse=True)
+        unique_rows = np.empty(len(unique_students), dtype=np.int64)
+        for i, student in enumerate(unique_students.tolist()):
+            if student not in self.student_index:
+                self.student_index[student] = len(self.students)
+                self.students.append(student)
+            unique_rows[i] = self.student_index[student]
+        self._grow(len(self.students))
+        return unique_rows, inverse.reshape(-1)
+
+    def update(self, student, clicks, time_spent, score):
+        """
+        Adds one behavior event.
+        """
+        row = self.student_index.get(student)
+        if row is None:
+            row = self.student_index[student] = len(self.students)
+            self.students.append(student)
+            self._grow(len(self.students))
+        values = np.array([clicks, time_spent, score], dtype=np.float64)
+        self.count[row] += 1
+        delta = values - self.mean[row]
+        self.mean[row] += delta / self.count[row]
+        self.m2[row] += delta * (values - self.mean[row])
+
+    def _combine(self, rows, count, mean, m2):
+        # Chan et al.: merge (count, mean, M2) partials into the given rows (rows must be unique)
+        count_a, mean_a = self.count[rows], self.mean[rows]
+        total = count_a + count
+        delta = mean - mean_a
+        self.mean[rows] = mean_a + delta * (count / total)[:, None]
+        self.m2[rows] += m2 + delta ** 2 * (count_a * count / total)[:, None]
+        self.count[rows] = total
+
+    def update_batch(self, students, values):
+        """
+        Adds a batch of events.
+
+        :param students: Array-like of student ids.
+        :param values: ``(n_events, 3)`` array-like of clicks, time_spent and score
+                       (or a DataFrame with those columns).
+        """
+        if isinstance(values, pd.DataFrame):
+            values = values[list(METRICS)]
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        unique_rows, inverse = self._rows(students)
+        n_unique = len(unique_rows)
+        count = np.bincount(inverse, minlength=n_unique)
+        mean = np.stack([np.bincount(inverse, values[:, j], n_unique) for j in range(values.shape[1])], axis=1)
+        mean /= count[:, None]
+        deviations = (values - mean[inverse]) ** 2
+        m2 = np.stack([np.bincount(inverse, deviations[:, j], n_unique) for j in range(values.shape[1])], axis=1)
+        self._combine(unique_rows, count, mean, m2)
+
+    def merge(self, other):
+        """
+        Folds another store (e.g. a parallel worker's partial aggregates) into this one.
+        """
+        if len(other) == 0:
+            return self
+        rows, inverse = self._rows(other.students)
+        n = len(other)
+        self._combine(rows[inverse], other.count[:n], other.mean[:n], other.m2[:n])
+        return self
+
+    def features(self, fill_std=None):
+        """
+        Exports the per-student features of learning_style_adption.py.
+
+        :param fill_std: Value for the std of single-event students (NaN by
+                         default, as in pandas; clustering needs a number).
+        :return: DataFrame with a student column followed by ``FEATURE_COLUMNS``.
+        """
+        n = len(self)
+        count = self.count[:n, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.sqrt(self.m2[:n] / (count - 1))
+        std[np.broadcast_to(count < 2, std.shape)] = np.nan if fill_std is None else fill_std
+        features = pd.DataFrame({"student": self.students})
+        for j, prefix in enumerate(METRICS.values()):
+            features[f"{prefix}_mean"] = self.mean[:n, j]
+            features[f"{prefix}_std"] = std[:, j]
+        return features
+
+    def save(self, path):
+        n = len(self)
+        np.savez(path, students=np.asarray(self.students), count=self.count[:n], mean=self.mean[:n], m2=self.m2[:n])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            store = cls(capacity=max(len(data["count"]), 1))
+            store.students = data["students"].tolist()
+            store.student_index = {student: row for row, student in enumerate(store.students)}
+            n = len(store.students)
+            store.count[:n], store.mean[:n], store.m2[:n] = data["count"], data["mean"], data["m2"]
+        return store
+
+
+def build_partial(path, chunksize, part=None):
+    """
+    Aggregates one piece of the event file (see ``split_input``), or all of it.
+    """
+    store = StudentFeatureStore()
+    for chunk in iter_behavior_chunks(path, chunksize, part):
+        store.update_batch(chunk["student"].to_numpy(), chunk[list(METRICS)])
+    return store
+
+
+def build_feature_store(path, chunksize=1_000_000, workers=1):
+    """
+    Builds a feature store from an event file. With ``workers > 1`` the file
+    is split into independent pieces (row groups or byte ranges), each read,
+    parsed and aggregated by its own process, and the partial aggregates are
+    merged, which the parallel Welford formula makes order-independent.
+    """
+    if workers == 1:
+        return build_partial(path, chunksize)
+    parts = split_input(path, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(build_partial, [path] * len(parts), [chunksize] * len(parts), parts))
+    store = StudentFeatureStore()
+    for partial in partials:
+        store.merge(partial)
+    return store
+
+
+# Example usage: python feature_store.py behavior_events.parquet --output student_features.npz --workers 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-student behavior features from an event log.")
+    parser.add_argument("events_path", help="CSV or Parquet file with student, topic, clicks, time_spent, score columns")
+    parser.add_argument("--output", default="student_features.npz")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    store = build_feature_store(args.events_path, args.chunksize, args.workers)
+    store.save(args.output)
+    print(f"Saved features for {len(store):,} students to {args.output}")
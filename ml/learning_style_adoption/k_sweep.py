@@ -0,0 +1,182 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from feature_store import FEATURE_COLUMNS, StudentFeatureStore
+
+_features = None  # Scaled features, set once per worker process
+
+
+def _init_worker(features):
+    global _features
+    _features = features
+
+
+def fit_candidate(k, seed, silhouette_sample=10_000):
+    """
+    Fits one k-means candidate on the worker's features.
+
+    :return: Dict with k, seed, inertia, sampled silhouette and fit seconds.
+    """
+    start = time.perf_counter()
+    kmeans = KMeans(n_clusters=k, random_state=seed, n_init=1).fit(_features)
+    sample_size = min(silhouette_sample, len(_features))
+    silhouette = silhouette_score(_features, kmeans.labels_, sample_size=sample_size, random_state=seed)
+    return {"k": k, "seed": seed, "inertia": float(kmeans.inertia_), "silhouette": float(silhouette),
+            "seconds": time.perf_counter() - start}
+
+
+def features_fingerprint(features, **options):
+    """
+    Content hash of the feature matrix and sweep options, used as the cache key.
+    """
+    digest = hashlib.sha256(np.ascontiguousarray(features, dtype=np.float64).tobytes())
+    digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def elbow_k(ks, inertia):
+    """
+    Elbow of the inertia curve: the k farthest below the straight line between
+    the first and last points (both axes normalized to [0, 1]).
+    """
+    ks, inertia = np.asarray(ks, dtype=np.float64), np.asarray(inertia, dtype=np.float64)
+    if len(ks) < 3:
+        return int(ks[0])
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    y = (inertia - inertia.min()) / (np.ptp(inertia) or 1.0)
+    line = y[0] + (y[-1] - y[0]) * x
+    return int(ks[np.argmax(line - y)])
+
+
+def choose_k(curve, criterion="silhouette"):
+    """
+    Picks k from the per-k curve: ``"silhouette"`` (highest silhouette of the
+    lowest-inertia seed, i.e. the model that would be kept) or ``"elbow"``
+    (knee of the best inertia per k).
+    """
+    if criterion == "silhouette":
+        return int(curve.loc[curve["silhouette"].idxmax(), "k"])
+    if criterion == "elbow":
+        return elbow_k(curve["k"], curve["inertia_min"])
+    raise ValueError(f"Unknown criterion {criterion!r}")
+
+
+def plot_curve(curve, best_k, path):
+    import matplotlib
+
+    matplotlib.use("Agg")  # Headless: render straight to file
+    import matplotlib.pyplot as plt
+
+    fig, inertia_axis = plt.subplots()
+    inertia_axis.plot(curve["k"], curve["inertia_min"], marker="o", label="Inertia")
+    inertia_axis.set_xlabel("Number of Clusters (k)")
+    inertia_axis.set_ylabel("Inertia")
+    silhouette_axis = inertia_axis.twinx()
+    silhouette_axis.plot(curve["k"], curve["silhouette"], marker="s", color="tab:orange", label="Silhouette")
+    silhouette_axis.set_ylabel("Silhouette (sampled)")
+    inertia_axis.axvline(best_k, linestyle="--", color="gray")
+    inertia_axis.set_title(f"Model Selection for k (chosen k={best_k})")
+    fig.savefig(path, bbox_inches="tight")
+    plt.close(fig)
+
+
+def sweep(features, k_values=range(2, 6), seeds=(0, 1, 2), workers=1, criterion="silhouette",
+          silhouette_sample=10_000, scale=True, cache_dir=None, plot_path=None):
+    """
+    Fits every (k, seed) candidate in parallel and picks k, without any
+    interactive plotting. Results are cached by a fingerprint of the features
+    and options, so an unchanged population is not re-swept.
+
+    :param features: ``(n_students, n_features)`` array or a DataFrame with ``FEATURE_COLUMNS``.
+    :param k_values: Candidate cluster counts.
+    :param seeds: ``KMeans`` seeds per k.
+    :param workers: Processes fitting candidates.
+    :param criterion: ``"silhouette"`` or ``"elbow"``.
+    :param silhouette_sample: Students sampled for each silhouette score.
+    :param scale: Standardize the features first (as learning_style_adption.py does).
+    :param cache_dir: Directory for ``sweep_<fingerprint>.json`` results.
+    :param plot_path: Optional PNG of the curve.
+    :return: ``(best_k, curve, runs)``: per-k summary and per-candidate DataFrames.
+    """
+    if isinstance(features, pd.DataFrame):
+        features = features[FEATURE_COLUMNS].to_numpy()
+    features = np.asarray(features, dtype=np.float64)
+    if scale:
+        features = StandardScaler().fit_transform(features)
+    k_values, seeds = [int(k) for k in k_values], [int(seed) for seed in seeds]
+
+    cache_path = None
+    if cache_dir is not None:
+        fingerprint = features_fingerprint(features, k_values=k_values, seeds=seeds,
+                                           silhouette_sample=silhouette_sample)
+        cache_path = os.path.join(cache_dir, f"sweep_{fingerprint}.json")
+    if cache_path is not None and os.path.exists(cache_path):
+        with open(cache_path, "r") as file:
+            runs = pd.DataFrame(json.load(file)["runs"])
+        print(f"Loaded cached sweep {cache_path}")
+    else:
+        tasks = [(k, seed) for k in k_values for seed in seeds]
+        start = time.perf_counter()
+        if workers == 1:
+            _init_worker(features)
+            results = [fit_candidate(k, seed, silhouette_sample) for k, seed in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as pool:
+                results = list(pool.map(fit_candidate, *zip(*tasks), [silhouette_sample] * len(tasks)))
+        print(f"Swept {len(tasks)} candidates with {workers} worker(s) in {time.perf_counter() - start:.2f}s")
+        runs = pd.DataFrame(results)
+        if cache_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump({"runs": results}, file, indent=4)
+            os.replace(tmp_path, cache_path)
+
+    best_runs = runs.loc[runs.groupby("k")["inertia"].idxmin()].set_index("k")
+    curve = runs.groupby("k").agg(
+        inertia_min=("inertia", "min"), silhouette_mean=("silhouette", "mean"), silhouette_std=("silhouette", "std"),
+    )
+    curve.insert(1, "silhouette", best_runs["silhouette"])
+    curve.insert(2, "best_seed", best_runs["seed"])
+    curve = curve.reset_index()
+    best_k = choose_k(curve, criterion)
+    if plot_path is not None:
+        plot_curve(curve, best_k, plot_path)
+    return best_k, curve, runs
+
+
+# Example usage: python k_sweep.py student_features.npz --k-min 2 --k-max 8 --workers 8 --plot k_sweep.png
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless k selection for learning-style clustering.")
+    parser.add_argument("features_path", help="Feature store .npz (feature_store.py) or CSV with the feature columns")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=5)
+    parser.add_argument("--seeds", type=int, default=3, help="Seeds per k")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--criterion", choices=["silhouette", "elbow"], default="silhouette")
+    parser.add_argument("--silhouette-sample", type=int, default=10_000)
+    parser.add_argument("--cache-dir", default="k_sweep_cache")
+    parser.add_argument("--output", default="k_sweep.csv", help="Per-k curve as CSV")
+    parser.add_argument("--plot", default=None, help="Optional PNG of the curve")
+    args = parser.parse_args()
+
+    if args.features_path.endswith(".npz"):
+        features = StudentFeatureStore.load(args.features_path).features(fill_std=0.0)
+    else:
+        features = pd.read_csv(args.features_path)
+    best_k, curve, _ = sweep(
+        features, range(args.k_min, args.k_max + 1), range(args.seeds), workers=args.workers,
+        criterion=args.criterion, silhouette_sample=args.silhouette_sample, cache_dir=args.cache_dir,
+        plot_path=args.plot,
+    )
+    curve.to_csv(args.output, index=False)
+    print(curve.to_string(index=False))
+    print(f"Chosen k: {best_k}")
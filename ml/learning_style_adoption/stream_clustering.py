@@ -0,0 +1,134 @@
+import argparse
+import os
+import joblib
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+from cluster_quality import silhouette_sampled
+from feature_store import FEATURE_COLUMNS, METRICS, StudentFeatureStore, iter_behavior_chunks
+from style_assigner import export_assigner
+
+
+def save_checkpoint(path, state):
+    tmp_path = f"{path}.tmp"
+    joblib.dump(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def train_streaming(events_path=None, n_clusters=3, chunksize=1_000_000, batch_size=4096, epochs=3,
+                    checkpoint_path=None, checkpoint_every=10, random_state=42, feature_store=None):
+    """
+    Clusters students by learning style without loading the event log.
+
+    Events are streamed in chunks and folded into a ``StudentFeatureStore``,
+    so memory grows with the number of students, not events. Passing a ready
+    ``feature_store`` instead of ``events_path`` skips the log scan. The scaler and
+    ``MiniBatchKMeans`` are then trained with ``partial_fit`` on mini-batches
+    of students. With ``checkpoint_path`` the aggregates, scaler and
+    centroids are checkpointed, and a rerun continues where the last one
+    stopped.
+
+    :param events_path: CSV or Parquet behavior event file.
+    :param feature_store: Prebuilt ``StudentFeatureStore`` to cluster instead.
+    :param epochs: Passes of mini-batch k-means over the students.
+    :param checkpoint_every: Chunks (or mini-batches) between checkpoints.
+    :return: ``(features, scaler, kmeans)`` with a ``learning_style`` column in ``features``.
+    """
+    state = {"stage": "aggregate" if feature_store is None else "scale", "rows_done": 0,
+             "store": StudentFeatureStore() if feature_store is None else feature_store, "scaler": StandardScaler(),
+             "kmeans": MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=random_state,
+                                       n_init=3),
+             "epoch": 0, "batches_done": 0, "chunksize": chunksize, "batch_size": batch_size}
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        state = joblib.load(checkpoint_path)
+        if (state["chunksize"], state["batch_size"]) != (chunksize, batch_size):
+            raise ValueError(f"Checkpoint {checkpoint_path} was written with chunksize={state['chunksize']}, "
+                             f"batch_size={state['batch_size']}")
+
+    def checkpoint():
+        if checkpoint_path is not None:
+            save_checkpoint(checkpoint_path, state)
+
+    # 1. Stream events into per-student aggregates
+    if state["stage"] == "aggregate":
+        rows_seen = chunks = 0
+        for chunk in iter_behavior_chunks(events_path, chunksize):
+            rows_seen += len(chunk)
+            if rows_seen <= state["rows_done"]:
+                continue  # Already aggregated before the last checkpoint
+            state["store"].update_batch(chunk["student"].to_numpy(), chunk[list(METRICS)])
+            state["rows_done"] = rows_seen
+            chunks += 1
+            if chunks % checkpoint_every == 0:
+                checkpoint()
+        state["stage"] = "scale"
+        checkpoint()
+
+    features = state["store"].features(fill_std=0.0)  # Single-event students have no spread
+    n_students = len(features)
+    X = features[FEATURE_COLUMNS].to_numpy()  # Extracted once; batches below are views of it
+
+    # 2. Fit the scaler in mini-batches
+    if state["stage"] == "scale":
+        for start in range(0, n_students, batch_size):
+            state["scaler"].partial_fit(X[start:start + batch_size])
+        state["stage"] = "cluster"
+        checkpoint()
+
+    # 3. Mini-batch k-means, shuffling students each epoch (reproducibly, so a resume sees the same order)
+    n_batches = -(-n_students // batch_size)
+    while state["stage"] == "cluster" and state["epoch"] < epochs:
+        order = np.random.default_rng(random_state + state["epoch"]).permutation(n_students)
+        for batch in range(state["batches_done"], n_batches):
+            rows = order[batch * batch_size:(batch + 1) * batch_size]
+            if len(rows) < n_clusters:
+                continue  # Too few students to update k centroids
+            state["kmeans"].partial_fit(state["scaler"].transform(X[rows]))
+            state["batches_done"] = batch + 1
+            if state["batches_done"] % checkpoint_every == 0:
+                checkpoint()
+        state["epoch"] += 1
+        state["batches_done"] = 0
+        checkpoint()
+    state["stage"] = "done"
+    checkpoint()
+
+    # 4. Assign every student in batches
+    labels = np.empty(n_students, dtype=np.int32)
+    for start in range(0, n_students, batch_size):
+        labels[start:start + batch_size] = state["kmeans"].predict(state["scaler"].transform(X[start:start + batch_size]))
+    features["learning_style"] = labels
+    return features, state["scaler"], state["kmeans"]
+
+
+# Example usage: python stream_clustering.py behavior_events.parquet --output learning_styles.csv --checkpoint clustering.ckpt
+#                python stream_clustering.py --features student_features.npz
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming learning-style clustering over a behavior event log.")
+    parser.add_argument("events_path", nargs="?", help="CSV or Parquet file with student, topic, clicks, time_spent, score columns")
+    parser.add_argument("--features", default=None, help="Feature store (.npz from feature_store.py) to cluster instead")
+    parser.add_argument("--output", default="learning_styles.csv")
+    parser.add_argument("--clusters", type=int, default=3)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file; a rerun resumes from it")
+    parser.add_argument("--checkpoint-every", type=int, default=10)
+    parser.add_argument("--assigner", default=None, help="Also export a StyleAssigner artifact (.npz)")
+    parser.add_argument("--quality-sample", type=int, default=10_000, help="Students sampled for the silhouette (0 = skip)")
+    args = parser.parse_args()
+
+    features, scaler, kmeans = train_streaming(
+        args.events_path, n_clusters=args.clusters, chunksize=args.chunksize, batch_size=args.batch_size,
+        epochs=args.epochs, checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every,
+        feature_store=StudentFeatureStore.load(args.features) if args.features else None,
+    )
+    features.to_csv(args.output, index=False)
+    if args.assigner is not None:
+        export_assigner(scaler, kmeans, args.assigner)
+    if args.quality_sample > 0:
+        quality = silhouette_sampled(scaler.transform(features[FEATURE_COLUMNS].to_numpy()), features["learning_style"].to_numpy(),
+                                     sample_size=args.quality_sample)
+        print(f"Silhouette Score: {quality['silhouette']:.4f} "
+              f"(95% CI {quality['ci_low']:.4f} to {quality['ci_high']:.4f}, {quality['seconds']:.2f}s)")
+    print(features["learning_style"].value_counts().sort_index().to_string())
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Style name per cluster label, as in personalize_recommendations in learning_style_adption.py
+LEARNING_STYLES = ["Visual Learner", "Fast Learner", "Slow Learner"]
+
+
+def export_assigner(scaler, kmeans, path, style_names=None):
+    """
+    Saves the fitted ``StandardScaler`` statistics and k-means centroids as a
+    small ``.npz`` artifact for ``StyleAssigner``.
+
+    :param scaler: Fitted ``StandardScaler`` (or None if the features were not scaled).
+    :param kmeans: Fitted ``KMeans`` / ``MiniBatchKMeans``.
+    :param style_names: Optional name per cluster label (default: ``LEARNING_STYLES`` for
+                        three clusters, otherwise the label numbers).
+    """
+    centroids = np.asarray(kmeans.cluster_centers_, dtype=np.float64)
+    n_features = centroids.shape[1]
+    mean = np.zeros(n_features) if scaler is None or scaler.mean_ is None else scaler.mean_
+    scale = np.ones(n_features) if scaler is None or scaler.scale_ is None else scaler.scale_
+    if style_names is not None:
+        names = style_names
+    elif len(centroids) == len(LEARNING_STYLES):
+        names = LEARNING_STYLES
+    else:
+        names = [str(label) for label in range(len(centroids))]
+    np.savez(path, mean=mean, scale=scale, centroids=centroids, style_names=np.array(names, dtype=str))
+
+
+class StyleAssigner:
+    """
+    Assigns learning styles by nearest centroid with plain NumPy (no sklearn
+    import), from an artifact written by ``export_assigner``. Loading reads a
+    few hundred bytes; one student costs a handful of vector ops, and large
+    batches are processed in chunks with one matrix product each.
+    """
+
+    def __init__(self, path, chunk_size=65_536):
+        """
+        :param path: ``.npz`` artifact from ``export_assigner``.
+        :param chunk_size: Rows per chunk for batch assignment (bounds temporary memory).
+        """
+        with np.load(path) as artifact:
+            self.mean = artifact["mean"]
+            self.scale = artifact["scale"]
+            self.centroids = artifact["centroids"]
+            self.style_names = artifact["style_names"].tolist()
+        self.chunk_size = chunk_size
+        self._centroid_norms = (self.centroids ** 2).sum(axis=1)
+
+    def assign(self, features):
+        """
+        Assigns one student or a batch.
+
+        :param features: ``(n_features,)`` vector or ``(n_students, n_features)`` matrix of raw
+                         (unscaled) features, in the order of ``FEATURE_COLUMNS``.
+        :return: ``(labels, distances)``: nearest cluster label(s) and the Euclidean
+                 distance(s) to that centroid in scaled space (scalars for one student).
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim == 1:
+            scaled = (features - self.mean) / self.scale
+            distances = ((self.centroids - scaled) ** 2).sum(axis=1)
+            label = int(np.argmin(distances))
+            return label, float(np.sqrt(distances[label]))
+
+        labels = np.empty(len(features), dtype=np.int32)
+        distances = np.empty(len(features))
+        for start in range(0, len(features), self.chunk_size):
+            scaled = (features[start:start + self.chunk_size] - self.mean) / self.scale
+            # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, with one matrix product per chunk
+            squared = (scaled ** 2).sum(axis=1)[:, None] - 2 * scaled @ self.centroids.T + self._centroid_norms
+            chunk_labels = np.argmin(squared, axis=1)
+            labels[start:start + len(scaled)] = chunk_labels
+            distances[start:start + len(scaled)] = np.sqrt(np.maximum(squared[np.arange(len(scaled)), chunk_labels], 0))
+        return labels, distances
+
+    def style_name(self, label):
+        return self.style_names[label]
@@ -0,0 +1,269 @@
+import json
+import numpy as np
+
+# Same defaults as the BKT parameters in main.py
+DEFAULT_PARAMS = {"p_init": 0.3, "p_learn": 0.1, "p_guess": 0.2, "p_slip": 0.1}
+CORRECT_THRESHOLD = 0.8  # Scores at or above this count as a correct answer
+MIN_ROUND_SIZE = 64  # Smaller update rounds are applied with a scalar loop
+
+
+def load_param_table(path):
+    """
+    Loads a per-skill parameter table written by fit_bkt_params.py.
+
+    :return: ``{skill: {p_init, p_learn, p_guess, p_slip}}`` (empty if the file is missing).
+    """
+    try:
+        with open(path, "r") as file:
+            table = json.load(file)
+    except FileNotFoundError:
+        return {}
+    return {skill: {name: row[name] for name in DEFAULT_PARAMS} for skill, row in table.items()}
+
+
+def bkt_update(p_mastery, correct, p_learn, p_guess, p_slip):
+    """
+    Vectorized BKT posterior + learning step (same update as
+    ``update_bkt_mastery`` in main.py). All arguments broadcast.
+    """
+    posterior = np.where(
+        correct,
+        (p_mastery * (1 - p_slip)) / (p_mastery * (1 - p_slip) + (1 - p_mastery) * p_guess),
+        (p_mastery * p_slip) / (p_mastery * p_slip + (1 - p_mastery) * (1 - p_guess)),
+    )
+    return posterior + (1 - posterior) * p_learn
+
+
+class BKTEngine:
+    """
+    BKT mastery held in a dense float32 students x skills matrix with string
+    id maps. Whole batches of observations are applied with NumPy ufuncs.
+    Each update is computed in float64 and only the result is rounded to
+    float32. The float32 rounding of values close to 1 is amplified by the
+    next incorrect answer, so values differ from the scalar float64 update by
+    up to about 1e-6 with the default parameters and 1e-4 with a small
+    ``p_slip`` (e.g. 0.05); the error does not grow with the number of updates.
+
+    ``param_table`` (``{skill: {p_init, p_learn, p_guess, p_slip}}``, as
+    written by fit_bkt_params.py) overrides the scalar parameters per skill.
+    """
+
+    def __init__(self, p_init=DEFAULT_PARAMS["p_init"], p_learn=DEFAULT_PARAMS["p_learn"],
+                 p_guess=DEFAULT_PARAMS["p_guess"], p_slip=DEFAULT_PARAMS["p_slip"], capacity=(64, 64),
+                 param_table=None):
+        self.p_init = p_init
+        self.p_learn = p_learn
+        self.p_guess = p_guess
+        self.p_slip = p_slip
+        self.param_table = param_table or {}
+        self._skill_params = np.empty((4, 0))  # Per-column p_init/p_learn/p_guess/p_slip
+        self.student_index = {}  # student key -> row
+        self.skill_index = {}    # skill key -> column
+        self.students = []
+        self.skills = []
+        self.mastery = np.full(capacity, p_init, dtype=np.float32)
+        self.observed = np.zeros(capacity, dtype=bool)  # Pairs present in the dict/JSON form
+
+    @property
+    def shape(self):
+        return len(self.students), len(self.skills)
+
+    def _grow(self, rows, cols):
+        capacity_rows, capacity_cols = self.mastery.shape
+        if rows <= capacity_rows and cols <= capacity_cols:
+            return
+        new_shape = (max(rows, 2 * capacity_rows if rows > capacity_rows else capacity_rows),
+                     max(cols, 2 * capacity_cols if cols > capacity_cols else capacity_cols))
+        mastery = np.full(new_shape, self.p_init, dtype=np.float32)
+        observed = np.zeros(new_shape, dtype=bool)
+        mastery[:capacity_rows, :capacity_cols] = self.mastery
+        observed[:capacity_rows, :capacity_cols] = self.observed
+        self.mastery, self.observed = mastery, observed
+
+    @staticmethod
+    def _ids(keys, index, names):
+        # Only unique keys go through the Python dict; the rest is vectorized
+        keys = np.asarray(keys)
+        if keys.dtype.kind not in "iuf":
+            keys = keys.astype(str)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)  # Numeric keys are stringified after dedup
+        unique_ids = np.empty(len(unique_keys), dtype=np.int64)
+        for i, key in enumerate(map(str, unique_keys.tolist())):
+            if key not in index:
+                index[key] = len(names)
+                names.append(key)
+            unique_ids[i] = index[key]
+        return unique_ids[inverse.reshape(-1)]
+
+    def ids(self, students, skills):
+        """
+        Maps student and skill keys to matrix rows/columns, adding new ones.
+        """
+        rows = self._ids(students, self.student_index, self.students)
+        cols = self._ids(skills, self.skill_index, self.skills)
+        self._grow(len(self.students), len(self.skills))
+        return rows, cols
+
+    def _column_params(self, cols):
+        if len(self._skill_params[0]) != len(self.skills):
+            defaults = {"p_init": self.p_init, "p_learn": self.p_learn, "p_guess": self.p_guess, "p_slip": self.p_slip}
+            self._skill_params = np.array([
+                [self.param_table.get(skill, defaults)[name] for skill in self.skills] for name in defaults
+            ])
+        return self._skill_params[:, cols]
+
+    def update_batch(self, students, skills, scores):
+        """
+        Applies a batch of ``(student, skill, score)`` observations. Repeated
+        (student, skill) pairs are applied in input order.
+
+        :param students: Array-like of student keys.
+        :param skills: Array-like of skill keys.
+        :param scores: Array-like of quiz scores (correct if >= 0.8) or booleans.
+        """
+        scores = np.asarray(scores)
+        if len(scores) == 0:
+            return
+        correct = scores if scores.dtype == bool else scores >= CORRECT_THRESHOLD
+        rows, cols = self.ids(students, skills)
+
+        # Occurrence number of each observation within its (student, skill) pair
+        pair = rows * self.mastery.shape[1] + cols
+        order = np.argsort(pair, kind="stable")
+        sorted_pair = pair[order]
+        group_start = np.r_[0, np.flatnonzero(sorted_pair[1:] != sorted_pair[:-1]) + 1]
+        group_sizes = np.diff(np.r_[group_start, len(pair)])
+        occurrence = np.empty(len(pair), dtype=np.int64)
+        occurrence[order] = np.arange(len(pair)) - np.repeat(group_start, group_sizes)
+
+        # Each round touches every pair at most once, so it can be vectorized.
+        # Rounds are contiguous slices of the observations sorted by occurrence.
+        by_round = np.argsort(occurrence, kind="stable")
+        round_ends = np.cumsum(np.bincount(occurrence))
+        round_start = 0
+        for round_end in round_ends:
+            if round_end - round_start < MIN_ROUND_SIZE:
+                break  # Few long histories left: a scalar loop beats per-round array overhead
+            self._apply(by_round[round_start:round_end], rows, cols, correct)
+            round_start = round_end
+        if round_start < len(by_round):
+            self._apply_sequential(by_round[round_start:], rows, cols, correct)
+
+    def _apply(self, batch, rows, cols, correct):
+        # One vectorized round (every pair at most once), computed in float64 and stored as float32
+        r, c = rows[batch], cols[batch]
+        prior = self.mastery[r, c].astype(np.float64)
+        if self.param_table:
+            p_init, p_learn, p_guess, p_slip = self._column_params(c)
+            prior = np.where(self.observed[r, c], prior, p_init)
+            self.mastery[r, c] = bkt_update(prior, correct[batch], p_learn, p_guess, p_slip)
+        else:
+            self.mastery[r, c] = bkt_update(prior, correct[batch], self.p_learn, self.p_guess, self.p_slip)
+        self.observed[r, c] = True
+
+    def _apply_sequential(self, batch, rows, cols, correct):
+        # Remaining observations in occurrence order, each pair carried as a Python float
+        r, c = rows[batch], cols[batch]
+        if self.param_table:
+            params = self._column_params(c).T.tolist()
+        else:
+            params = [[self.p_init, self.p_learn, self.p_guess, self.p_slip]] * len(batch)
+        current = {}
+        for row, col, is_correct, (p_init, p_learn, p_guess, p_slip) in zip(
+                r.tolist(), c.tolist(), correct[batch].tolist(), params):
+            p_mastery = current.get((row, col))
+            if p_mastery is None:
+                observed = self.observed[row, col] or not self.param_table
+                p_mastery = float(self.mastery[row, col]) if observed else p_init
+            if is_correct:
+                posterior = (p_mastery * (1 - p_slip)) / (p_mastery * (1 - p_slip) + (1 - p_mastery) * p_guess)
+            else:
+                posterior = (p_mastery * p_slip) / (p_mastery * p_slip + (1 - p_mastery) * (1 - p_guess))
+            # Rounded like a stored value, so results do not depend on which path ran
+            current[(row, col)] = float(np.float32(posterior + (1 - posterior) * p_learn))
+        for (row, col), p_mastery in current.items():
+            self.mastery[row, col] = p_mastery
+            self.observed[row, col] = True
+
+    def get(self, student, skill):
+        """
+        Returns the mastery of one pair, or None if it has never been observed.
+        """
+        row = self.student_index.get(str(student))
+        col = self.skill_index.get(str(skill))
+        if row is None or col is None or not self.observed[row, col]:
+            return None
+        return float(self.mastery[row, col])
+
+    def matrix(self):
+        """
+        Returns ``(mastery, observed)`` views trimmed to the known students/skills.
+        """
+        n_students, n_skills = self.shape
+        return self.mastery[:n_students, :n_skills], self.observed[:n_students, :n_skills]
+
+    @classmethod
+    def from_dict(cls, data, **params):
+        """
+        Builds an engine from the ``bkt_mastery.json`` dict format.
+        """
+        engine = cls(**params)
+        students, skills, values = [], [], []
+        for student_key, skill_map in data.items():
+            for skill_key, p_mastery in skill_map.items():
+                students.append(student_key)
+                skills.append(skill_key)
+                values.append(p_mastery)
+        if values:
+            rows, cols = engine.ids(students, skills)
+            engine.mastery[rows, cols] = values
+            engine.observed[rows, cols] = True
+        return engine
+
+    def to_dict(self):
+        """
+        Exports observed pairs in the ``bkt_mastery.json`` dict format.
+        """
+        mastery, observed = self.matrix()
+        data = {}
+        for row, col in zip(*np.nonzero(observed)):
+            data.setdefault(self.students[row], {})[self.skills[col]] = float(mastery[row, col])
+        return data
+
+    def state(self):
+        """
+        Returns the engine state as plain arrays (for ``np.savez`` checkpoints).
+        """
+        mastery, observed = self.matrix()
+        return {
+            "mastery": mastery,
+            "observed": observed,
+            "students": np.array(self.students, dtype=str),
+            "skills": np.array(self.skills, dtype=str),
+        }
+
+    @classmethod
+    def from_state(cls, state, **params):
+        """
+        Rebuilds an engine from ``state()`` arrays.
+        """
+        n_students, n_skills = state["mastery"].shape
+        engine = cls(capacity=(max(n_students, 64), max(n_skills, 64)), **params)
+        for key in state["students"].tolist():
+            engine.student_index[key] = len(engine.students)
+            engine.students.append(key)
+        for key in state["skills"].tolist():
+            engine.skill_index[key] = len(engine.skills)
+            engine.skills.append(key)
+        engine.mastery[:n_students, :n_skills] = state["mastery"]
+        engine.observed[:n_students, :n_skills] = state["observed"]
+        return engine
+
+    @classmethod
+    def load_json(cls, path, **params):
+        with open(path, "r") as file:
+            return cls.from_dict(json.load(file), **params)
+
+    def save_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=4)
@@ -0,0 +1,184 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from bkt_engine import BKTEngine
+from svd_factors import SVDFactors
+
+
+def bkt_matrix(engine, students, skills):
+    """
+    BKT mastery aligned to the given students x skills, with a mask of the
+    pairs that have actually been observed.
+    """
+    rows = np.array([engine.student_index.get(str(student), -1) for student in students], dtype=np.int64)
+    cols = np.array([engine.skill_index.get(str(skill), -1) for skill in skills], dtype=np.int64)
+    mastery = np.zeros((len(students), len(skills)), dtype=np.float64)
+    observed = np.zeros((len(students), len(skills)), dtype=bool)
+    known_rows, known_cols = np.flatnonzero(rows >= 0), np.flatnonzero(cols >= 0)
+    if len(known_rows) and len(known_cols):
+        block = np.ix_(rows[known_rows], cols[known_cols])
+        mastery[np.ix_(known_rows, known_cols)] = engine.mastery[block]
+        observed[np.ix_(known_rows, known_cols)] = engine.observed[block]
+    return mastery, observed
+
+
+def time_factor_table(quiz_state, students, skills):
+    """
+    Latest attempt time / per-skill average for every attempted pair of
+    ``students`` x ``skills``, as flat arrays sorted by student row.
+
+    :return: ``(rows, cols, factors)`` indexing into ``students`` and ``skills``.
+    """
+    skill_cols = {skill: col for col, skill in enumerate(skills)}
+    average = np.array([quiz_state.time_sum[skill] / quiz_state.time_count[skill] if quiz_state.time_count.get(skill)
+                        else np.nan for skill in skills])
+    # One pass to flatten the per-student dicts; the arithmetic is vectorized
+    attempts = [(row, skill_cols.get(skill, -1), time) for row, student in enumerate(students)
+                for skill, time in quiz_state.last_time.get(student, {}).items()]
+    if not attempts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    rows, cols, times = (np.array(column) for column in zip(*attempts))
+    known = cols >= 0
+    rows, cols, times = rows[known].astype(np.int64), cols[known].astype(np.int64), times[known].astype(np.float64)
+    return rows, cols, times / average[cols]
+
+
+def time_factor_matrix(table, start, stop, n_skills):
+    """
+    Dense time factors for student rows ``start:stop`` of a ``time_factor_table``
+    (NaN where the student never attempted the skill).
+    """
+    rows, cols, factors = table
+    low, high = np.searchsorted(rows, [start, stop])
+    matrix = np.full((stop - start, n_skills), np.nan)
+    matrix[rows[low:high] - start, cols[low:high]] = factors[low:high]
+    return matrix
+
+
+def recommend_rows(cf, bkt_mastery, bkt_observed, time_factors, top_n=3, threshold=0.9):
+    """
+    Vectorized core of ``recommend_topics_for_next_quiz`` over a block of students.
+
+    :return: int32 array ``(n_students, top_n)`` of skill column indices, weakest
+             first, padded with -1 where fewer than ``top_n`` skills are weak.
+    """
+    mastery = np.where(bkt_observed, bkt_mastery, cf)
+    mastery = mastery * np.where(time_factors > 1.2, 0.9, np.where(time_factors < 0.8, 1.05, 1.0))
+    mastery = np.where(mastery < threshold, mastery, np.inf)  # Mastered skills are never recommended
+
+    top_n = min(top_n, mastery.shape[1])
+    n_students = mastery.shape[0]
+
+    # k-th smallest mastery per row in O(skills); ties at the boundary are
+    # resolved in skill order, as the sorted() in the per-student path does
+    kth = np.partition(mastery, top_n - 1, axis=1)[:, top_n - 1:top_n]
+    below = mastery < kth
+    at_kth = mastery == kth
+    needed = top_n - below.sum(axis=1, keepdims=True)
+    selected = below | (at_kth & (np.cumsum(at_kth, axis=1) <= needed))
+    candidates = np.nonzero(selected)[1].reshape(n_students, top_n)
+
+    values = np.take_along_axis(mastery, candidates, axis=1)
+    order = np.lexsort((candidates, values), axis=1)  # By mastery, then skill order for ties
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+    return np.where(np.isfinite(values), candidates, -1).astype(np.int32)
+
+
+_shared = None  # (factors, engine, time_table, students, skills, top_n, threshold), set once per worker process
+
+
+def _init_worker(*shared):
+    global _shared
+    _shared = shared
+
+
+def _write_shard(path, start, stop):
+    # Builds this shard's matrices in the worker, so only one shard is in memory per process
+    factors, engine, time_table, students, skills, top_n, threshold = _shared
+    shard_students = students[start:stop]
+    bkt_mastery, bkt_observed = bkt_matrix(engine, shard_students, skills)
+    recommendations = recommend_rows(
+        factors.predict_matrix(shard_students, skills), bkt_mastery, bkt_observed,
+        time_factor_matrix(time_table, start, stop, len(skills)), top_n, threshold,
+    )
+    np.savez(path, students=np.array([str(s) for s in shard_students]), skills=np.asarray(skills),
+             recommendations=recommendations)
+    return path
+
+
+def precompute_recommendations(model, mastery_data, quiz_state, students, skills, output_dir, top_n=3,
+                               threshold=0.9, shards=1, workers=1):
+    """
+    Computes next-quiz recommendations for every student in bulk and writes
+    them to compact lookup files (one per student-range shard).
+
+    The factors, BKT engine and time factors are sent to each worker once;
+    workers build the dense matrices of one shard at a time, so memory holds
+    a shard's students x skills per worker rather than the whole population.
+
+    :param model: Fitted ``surprise.SVD`` or its ``SVDFactors``.
+    :param mastery_data: ``BKTEngine`` or a ``bkt_mastery.json``-format dict.
+    :param quiz_state: ``QuizEventState`` providing time factors.
+    :param students: Student ids to precompute.
+    :param skills: Candidate skill ids.
+    :param output_dir: Directory for ``recommendations_<shard>.npz`` files.
+    :param shards: Number of contiguous student ranges.
+    :param workers: Processes used to compute the shards.
+    :return: List of written shard paths.
+    """
+    factors = model if isinstance(model, SVDFactors) else SVDFactors.from_model(model)
+    engine = mastery_data if isinstance(mastery_data, BKTEngine) else BKTEngine.from_dict(mastery_data)
+    os.makedirs(output_dir, exist_ok=True)
+    students, skills = list(students), list(skills)
+    shared = (factors, engine, time_factor_table(quiz_state, students, skills), students, skills, top_n, threshold)
+    bounds = np.linspace(0, len(students), shards + 1).astype(int)
+    jobs = [(os.path.join(output_dir, f"recommendations_{shard}.npz"), int(start), int(stop))
+            for shard, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))]
+
+    if workers == 1:
+        _init_worker(*shared)
+        return [_write_shard(*job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as pool:
+        return list(pool.map(_write_shard, *zip(*jobs)))
+
+
+class RecommendationLookup:
+    """
+    O(1) reader for precomputed recommendations, for use in request handlers.
+    """
+
+    def __init__(self, output_dir):
+        self._rows = {}
+        for path in sorted(glob.glob(os.path.join(output_dir, "recommendations_*.npz"))):
+            with np.load(path) as shard:
+                recommendations, skills = shard["recommendations"], shard["skills"]
+                for student, row in zip(shard["students"].tolist(), recommendations):
+                    self._rows[student] = [skills[col].item() for col in row if col >= 0]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get(self, student_id):
+        """
+        Returns the precomputed skills (weakest first), None if the student has
+        mastered every candidate skill, or KeyError if they were not precomputed.
+        """
+        skills = self._rows[str(student_id)]
+        return skills or None
+
+
+# Example usage: precompute recommendations for the sample students in main.py
+if __name__ == "__main__":
+    import main
+
+    skills = [101, 102, 103, 104, 105, 106, 107, 108, 109, 110]
+    students = sorted(main.quiz_state.events)
+    for student_id in students:
+        main.quiz_state.sync(student_id)
+    precompute_recommendations(main.cf_factors, main.bkt_mastery_data, main.quiz_state, students, skills,
+                               "recommendations", threshold=main.MASTERY_THRESHOLD)
+    lookup = RecommendationLookup("recommendations")
+    for student_id in students:
+        print(f"Student {student_id}: {lookup.get(student_id)}")
@@ -0,0 +1,221 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from bkt_engine import CORRECT_THRESHOLD, DEFAULT_PARAMS
+from replay_events import iter_routed_chunks
+
+PARAM_NAMES = list(DEFAULT_PARAMS)
+
+# Candidate values per parameter; guess and slip stay below 0.5 so that a
+# correct answer always raises mastery (the usual BKT identifiability bound)
+DEFAULT_GRID = {
+    "p_init": np.round(np.arange(0.05, 1.0, 0.1), 2),
+    "p_learn": np.array([0.01, 0.02, 0.05, 0.08, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5]),
+    "p_guess": np.round(np.arange(0.05, 0.5, 0.1), 2),
+    "p_slip": np.round(np.arange(0.05, 0.5, 0.1), 2),
+}
+
+
+def skill_sequences(events):
+    """
+    Splits events into one padded correctness matrix per skill.
+
+    :param events: DataFrame with student, skill and score columns, in arrival order.
+    :return: Dict ``skill -> (correct, mask)``, both bool ``(n_students, max_attempts)``,
+             each row one student's attempts in arrival order.
+    """
+    events = events.sort_values(["skill", "student"], kind="stable")  # Stable: keeps each pair's arrival order
+    sequences = {}
+    for skill, group in events.groupby("skill", sort=False):
+        rows = pd.factorize(group["student"])[0]
+        cols = group.groupby("student", sort=False).cumcount().to_numpy()
+        correct = np.zeros((rows.max() + 1, cols.max() + 1), dtype=bool)
+        mask = np.zeros_like(correct)
+        correct[rows, cols] = group["score"].to_numpy() >= CORRECT_THRESHOLD
+        mask[rows, cols] = True
+        sequences[str(skill)] = (correct, mask)
+    return sequences
+
+
+def _codes(values, index):
+    # Dense integer codes for ids; only the unique values of a chunk go through the dict
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([index.setdefault(value, len(index)) for value in unique_values.tolist()], dtype=np.int64)
+    return codes[inverse.reshape(-1)]
+
+
+def stream_skill_sequences(path, chunksize=1_000_000):
+    """
+    Builds the ``skill_sequences`` of an event file without loading it, in two
+    streaming passes: the first counts the attempts of every (skill, student)
+    pair, the second writes each answer straight into its slot. Memory holds
+    one chunk, one byte per event and a few integers per pair. Each student's
+    attempts keep their file (arrival) order, as in ``iter_routed_chunks``.
+
+    :return: Dict ``skill -> (correct, mask)``, as ``skill_sequences``.
+    """
+    skill_index, student_index = {}, {}
+
+    # 1. Attempts per (skill, student) pair, keyed by skill code << 32 | student code
+    pair_keys, pair_counts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pending = []
+    for _, [(students, skills, _)] in iter_routed_chunks(path, chunksize):
+        keys = _codes(skills, skill_index) << 32 | _codes(students, student_index)
+        pending.append(np.unique(keys, return_counts=True))
+        if sum(len(chunk_keys) for chunk_keys, _ in pending) >= max(len(pair_keys), chunksize):
+            pair_keys, pair_counts = _merge_counts(pair_keys, pair_counts, pending)
+            pending = []
+    pair_keys, pair_counts = _merge_counts(pair_keys, pair_counts, pending)
+
+    # 2. Answers in a flat buffer, grouped by pair in key order, each pair's attempts in file order
+    starts = np.r_[0, np.cumsum(pair_counts)[:-1]]
+    filled = np.zeros(len(pair_keys), dtype=np.int64)
+    answers = np.zeros(int(pair_counts.sum()), dtype=bool)
+    for _, [(students, skills, scores)] in iter_routed_chunks(path, chunksize):
+        pair = np.searchsorted(pair_keys, _codes(skills, skill_index) << 32 | _codes(students, student_index))
+        order = np.argsort(pair, kind="stable")
+        sorted_pair = pair[order]
+        first = np.r_[0, np.flatnonzero(sorted_pair[1:] != sorted_pair[:-1]) + 1]
+        sizes = np.diff(np.r_[first, len(pair)])
+        occurrence = np.empty(len(pair), dtype=np.int64)
+        occurrence[order] = np.arange(len(pair)) - np.repeat(first, sizes)
+        answers[starts[pair] + filled[pair] + occurrence] = scores >= CORRECT_THRESHOLD
+        filled[sorted_pair[first]] += sizes
+
+    # 3. One padded matrix per skill, a row per student
+    bounds = np.searchsorted(pair_keys >> 32, np.arange(len(skill_index) + 1))
+    sequences = {}
+    for code, skill in enumerate(skill_index):
+        low, high = bounds[code], bounds[code + 1]
+        counts = pair_counts[low:high]
+        offsets = starts[low:high] - starts[low]
+        rows = np.repeat(np.arange(high - low), counts)
+        cols = np.arange(counts.sum()) - np.repeat(offsets, counts)
+        correct = np.zeros((high - low, counts.max()), dtype=bool)
+        mask = np.zeros_like(correct)
+        correct[rows, cols] = answers[starts[low]:starts[low] + counts.sum()]
+        mask[rows, cols] = True
+        sequences[str(skill)] = (correct, mask)
+    return sequences
+
+
+def _merge_counts(keys, counts, pending):
+    # Folds per-chunk (keys, counts) into the sorted running totals
+    if not pending:
+        return keys, counts
+    all_keys = np.concatenate([keys] + [chunk_keys for chunk_keys, _ in pending])
+    all_counts = np.concatenate([counts] + [chunk_counts for _, chunk_counts in pending])
+    merged_keys, inverse = np.unique(all_keys, return_inverse=True)
+    merged_counts = np.bincount(inverse.reshape(-1), all_counts, len(merged_keys))
+    return merged_keys, merged_counts.astype(np.int64)
+
+
+def log_likelihood(correct, lengths, p_init, p_learn, p_guess, p_slip):
+    """
+    BKT forward pass over every sequence for every parameter candidate at once.
+
+    :param correct: bool ``(n_sequences, length)`` answers, rows sorted by
+                    decreasing length, so that the sequences still running at
+                    step t are always the first rows.
+    :param lengths: int ``(n_sequences,)`` attempts per sequence (non-increasing).
+    :param p_init: float array ``(n_candidates,)``; likewise the other parameters.
+    :return: Total log-likelihood per candidate, ``(n_candidates,)``.
+    """
+    p_init, p_learn, p_guess, p_slip = (np.asarray(p, dtype=np.float64)[:, None]
+                                        for p in (p_init, p_learn, p_guess, p_slip))
+    p_mastery = np.broadcast_to(p_init, (len(p_init), correct.shape[0])).copy()
+    total = np.zeros(len(p_init))
+    for t in range(correct.shape[1]):
+        active = int(np.count_nonzero(lengths > t))
+        p_mastery = p_mastery[:, :active]
+        right = correct[:active, t]
+        p_correct = p_mastery * (1 - p_slip) + (1 - p_mastery) * p_guess
+        likelihood = np.where(right, p_correct, 1 - p_correct)
+        total += np.log(np.maximum(likelihood, 1e-12)).sum(axis=1)
+        # Posterior given the answer (same as bkt_update), then the learning step
+        posterior = np.where(right, p_mastery * (1 - p_slip), p_mastery * p_slip) / likelihood
+        p_mastery = posterior + (1 - posterior) * p_learn
+    return total
+
+
+def fit_skill(skill, correct, mask, grid=None, chunk_size=1024):
+    """
+    Grid-searches the BKT parameters that maximize the likelihood of one
+    skill's sequences. Sequences are processed in chunks to bound memory.
+
+    :return: ``(skill, params, log_likelihood, n_observations, seconds)``
+    """
+    start = time.perf_counter()
+    grid = DEFAULT_GRID if grid is None else grid
+    candidates = np.array(list(itertools.product(*(grid[name] for name in PARAM_NAMES))), dtype=np.float64)
+    lengths = mask.sum(axis=1)
+    order = np.argsort(-lengths, kind="stable")
+    correct, lengths = correct[order], lengths[order]
+    total = np.zeros(len(candidates))
+    for chunk in range(0, correct.shape[0], chunk_size):
+        total += log_likelihood(correct[chunk:chunk + chunk_size], lengths[chunk:chunk + chunk_size], *candidates.T)
+    best = int(np.argmax(total))
+    params = dict(zip(PARAM_NAMES, candidates[best].tolist()))
+    return skill, params, float(total[best]), int(lengths.sum()), time.perf_counter() - start
+
+
+def fit_all(events, workers=1, grid=None, min_observations=50, output_path=None):
+    """
+    Fits BKT parameters for every skill, distributing skills over a process pool.
+
+    :param events: DataFrame with student, skill and score columns in arrival order, or
+                   prebuilt sequences from ``skill_sequences`` / ``stream_skill_sequences``.
+    :param workers: Number of processes.
+    :param min_observations: Skills with fewer observations keep ``DEFAULT_PARAMS``.
+    :param output_path: Optional JSON file for the parameter table.
+    :return: ``{skill: {p_init, p_learn, p_guess, p_slip, n_observations, log_likelihood, fit_seconds}}``
+    """
+    sequences = events if isinstance(events, dict) else skill_sequences(events)
+    # Largest skills first, so no worker is left with a big one at the end
+    skills = sorted(sequences, key=lambda skill: -sequences[skill][1].sum())
+    fit_skills = [skill for skill in skills if sequences[skill][1].sum() >= min_observations]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [fit_skill(skill, *sequences[skill], grid) for skill in fit_skills]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fit_skill, skill, *sequences[skill], grid) for skill in fit_skills]
+            results = [future.result() for future in futures]
+    seconds = time.perf_counter() - start
+
+    table = {}
+    for skill, params, total, observations, fit_seconds in results:
+        table[skill] = dict(params, n_observations=observations, log_likelihood=total, fit_seconds=fit_seconds)
+        print(f"Skill {skill}: {params} ({observations:,} observations, {fit_seconds:.2f}s)")
+    for skill in skills:
+        if skill not in table:
+            table[skill] = dict(DEFAULT_PARAMS, n_observations=int(sequences[skill][1].sum()),
+                                log_likelihood=None, fit_seconds=0.0)
+    print(f"Fitted {len(fit_skills)} skills with {workers} worker(s) in {seconds:.2f}s")
+
+    if output_path is not None:
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(table, file, indent=4)
+        os.replace(tmp_path, output_path)
+    return table
+
+
+# Example usage: python fit_bkt_params.py quiz_events.parquet --output bkt_params.json --workers 8
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit per-skill BKT parameters from a quiz event file.")
+    parser.add_argument("events_path", help="CSV or Parquet file with student, skill, score columns, in arrival order")
+    parser.add_argument("--output", default="bkt_params.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--min-observations", type=int, default=50)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    sequences = stream_skill_sequences(args.events_path, args.chunksize)
+    fit_all(sequences, workers=args.workers, min_observations=args.min_observations, output_path=args.output)
@@ -1,53 +1,147 @@
+import atexit
 import json
+import os
+import uuid
 from surprise import SVD, Dataset, Reader
 from surprise.model_selection import train_test_split
 import pandas as pd
 import numpy as np
+from bkt_engine import load_param_table
+from mastery_cache import MasteryCache
+from mastery_log import MasteryLog, canonical_key, normalize_mastery_keys
+from mastery_store import ShardedMasteryStore
+from quiz_state import QuizEventState
+from svd_factors import SVDFactors
 
 # Mastery Threshold
 MASTERY_THRESHOLD = 0.9
 BKT_FILE = "bkt_mastery.json"  # File to store BKT mastery data
+BKT_LOG_FILE = "bkt_mastery.log"  # Append-only log of updates since the last snapshot
+BKT_CURSOR_FILE = "bkt_cursors.json"  # Per-student count of quiz events already applied to BKT
+QUIZ_EVENTS_FILE = "quiz_events.csv"  # Quiz results recorded at runtime (student, skill, score, time, event_id)
+BKT_PARAMS_FILE = "bkt_params.json"  # Per-skill BKT parameters from fit_bkt_params.py (optional)
+BKT_STORE_DIR = "bkt_mastery_store"  # Shard files for the multi-process store
+CF_FOLD_IN_EPOCHS = 3  # SGD passes over each new quiz result folded into the CF factors
+MASTERY_CACHE_SIZE = 10_000  # Students kept in the read cache
+MASTERY_CACHE_TTL = 30.0  # Seconds before a cached student is re-read (bounds staleness across processes)
+PERSISTENCE_MODE = "wal"  # "wal" (log + periodic snapshot), "snapshot" (rewrite BKT_FILE per update) or "sharded"
 
 # Bayesian Knowledge Tracing (BKT) Parameters
 p_init = 0.3  # Initial probability of mastery
 p_learn = 0.1  # Probability of learning after each attempt
 p_guess = 0.2  # Probability of guessing correctly
 p_slip = 0.1   # Probability of slipping (incorrect answer despite mastery)
+skill_params = load_param_table(BKT_PARAMS_FILE)  # Per-skill overrides of the defaults above
+
+mastery_log = MasteryLog(BKT_FILE, BKT_LOG_FILE, cursor_path=BKT_CURSOR_FILE) if PERSISTENCE_MODE == "wal" else None
+if mastery_log is not None:
+    atexit.register(mastery_log.close)  # Commit the last group of records
+
+# Safe to share between worker processes (migrate BKT_FILE with mastery_store.py first)
+mastery_store = (
+    ShardedMasteryStore(BKT_STORE_DIR, params={"p_init": p_init, "p_learn": p_learn, "p_guess": p_guess, "p_slip": p_slip},
+                        param_table=skill_params)
+    if PERSISTENCE_MODE == "sharded" else None
+)
 
 # Load or Initialize BKT Mastery Data
 def load_bkt_mastery():
+    if mastery_store is not None:
+        return {}  # Read per student from the store, which other processes also update
+    if mastery_log is not None:
+        return mastery_log.load()  # Snapshot + log replay
     try:
         with open(BKT_FILE, "r") as file:
-            return json.load(file)
+            return normalize_mastery_keys(json.load(file))  # Older files keyed skills as "101.0"
     except (FileNotFoundError, json.JSONDecodeError):
         return {}
 
 bkt_mastery_data = load_bkt_mastery()
 
+# Load the per-student quiz-history cursors persisted with the mastery data
+def load_applied_events():
+    if mastery_store is not None:
+        return {}  # Kept in the store, next to each student's mastery
+    if mastery_log is not None:
+        return mastery_log.cursors  # Snapshot + log replay, in step with the mastery data
+    try:
+        with open(BKT_CURSOR_FILE, "r") as file:
+            return {canonical_key(student_key): events for student_key, events in json.load(file).items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+applied_events = load_applied_events()
+
 # Save BKT Mastery Data
 def save_bkt_mastery():
+    if mastery_store is not None:
+        return  # Every update is already committed
+    if mastery_log is not None:
+        mastery_log.compact()
+        return
     with open(BKT_FILE, "w") as file:
         json.dump(bkt_mastery_data, file, indent=4)
+    with open(BKT_CURSOR_FILE, "w") as file:
+        json.dump(applied_events, file, indent=4)
 
 # Function to Update BKT Mastery
-def update_bkt_mastery(student_id, skill, score):
-    """Updates BKT mastery probability for a given student and skill."""
+def update_bkt_mastery(student_id, skill, score, applied=None, event_id=None):
+    """
+    Updates BKT mastery probability for a given student and skill.
+
+    ``applied`` is the observation's 1-based position in the student's quiz
+    history. It is persisted with the mastery value, and an observation at or
+    below the persisted position is skipped as already applied. The shared
+    store is written by several processes, whose histories differ, so it
+    skips observations by ``event_id`` instead.
+    """
+    if mastery_store is not None:
+        mastery_store.update(student_id, skill, score, event_id=event_id)
+        mastery_cache.invalidate(student_id)
+        return
+    params = skill_params.get(str(skill), {"p_init": p_init, "p_learn": p_learn, "p_guess": p_guess, "p_slip": p_slip})
     student_key = str(student_id)
+    if applied is not None:
+        if applied <= applied_events.get(student_key, 0):
+            return  # Already applied, e.g. by an earlier run
+        applied_events[student_key] = applied
     if student_key not in bkt_mastery_data:
         bkt_mastery_data[student_key] = {}
     if str(skill) not in bkt_mastery_data[student_key]:
-        bkt_mastery_data[student_key][str(skill)] = p_init
+        bkt_mastery_data[student_key][str(skill)] = params["p_init"]
 
     p_mastery = bkt_mastery_data[student_key][str(skill)]
 
     if score >= 0.8:  # Correct answer
-        p_mastery = (p_mastery * (1 - p_slip)) / (p_mastery * (1 - p_slip) + (1 - p_mastery) * p_guess)
+        p_mastery = (p_mastery * (1 - params["p_slip"])) / (p_mastery * (1 - params["p_slip"]) + (1 - p_mastery) * params["p_guess"])
     else:  # Incorrect answer
-        p_mastery = (p_mastery * p_slip) / (p_mastery * p_slip + (1 - p_mastery) * (1 - p_guess))
+        p_mastery = (p_mastery * params["p_slip"]) / (p_mastery * params["p_slip"] + (1 - p_mastery) * (1 - params["p_guess"]))
 
     # Update mastery with learning probability
-    bkt_mastery_data[student_key][str(skill)] = p_mastery + (1 - p_mastery) * p_learn
-    save_bkt_mastery()
+    bkt_mastery_data[student_key][str(skill)] = p_mastery + (1 - p_mastery) * params["p_learn"]
+    if mastery_log is not None:
+        mastery_log.append(student_key, str(skill), bkt_mastery_data[student_key][str(skill)], applied)
+    else:
+        save_bkt_mastery()
+    mastery_cache.invalidate(student_id)  # After the write, so a concurrent read cannot re-cache the old value
+
+# Number of the student's quiz events already applied to BKT (persisted cursor)
+def get_applied_events(student_id):
+    if mastery_store is not None:
+        return 0  # Offer every event; the store skips the ids it has already applied
+    return applied_events.get(str(student_id), 0)
+
+# Read one student's BKT mastery from the store, bypassing the cache
+def read_student_mastery(student_id):
+    if mastery_store is not None:
+        return mastery_store.get_student(student_id)
+    return dict(bkt_mastery_data.get(str(student_id), {}))
+
+mastery_cache = MasteryCache(read_student_mastery, max_entries=MASTERY_CACHE_SIZE, ttl=MASTERY_CACHE_TTL)
+
+# Current BKT mastery of one student ({skill: p_mastery}, read-only)
+def get_student_mastery(student_id):
+    return mastery_cache.get(student_id)
 
 # Sample Student-Quiz Data
 quiz_data = [
@@ -62,34 +156,69 @@ dataset = Dataset.load_from_df(df[["student", "skill", "score"]], reader)
 trainset, testset = train_test_split(dataset, test_size=0.001)
 model = SVD()
 model.fit(trainset)
+cf_factors = SVDFactors.from_model(model)  # Vectorized predictions + online fold-in between refits
+
+# Load the quiz results recorded by earlier runs
+def load_recorded_quiz_results():
+    try:
+        # Files written before results had ids lack the last column; those rows get positional ids
+        recorded = pd.read_csv(QUIZ_EVENTS_FILE, header=None, skiprows=1, names=["student", "skill", "score", "time", "event_id"])
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return []
+    recorded["event_id"] = recorded["event_id"].astype(object).where(recorded["event_id"].notna(), None)
+    return list(recorded.itertuples(index=False, name=None))
+
+# Quiz history consumed incrementally by the recommender. The history is
+# rebuilt in the same order on every start, so the persisted cursors stay valid.
+quiz_state = QuizEventState(update_bkt_mastery, load_cursor=get_applied_events)
+quiz_state.add_events(quiz_data)
+quiz_state.add_events(load_recorded_quiz_results())
+
+# Record a new quiz result and fold it into the student's CF factors (no refit)
+def record_quiz_result(student_id, skill, score, time):
+    new_file = not os.path.exists(QUIZ_EVENTS_FILE)
+    with open(QUIZ_EVENTS_FILE, "a") as file:  # Persist before BKT can see it
+        if new_file:
+            file.write("student,skill,score,time,event_id\n")
+        event_id = uuid.uuid4().hex  # Unique across processes sharing the mastery store
+        file.write(f"{student_id},{skill},{score},{time},{event_id}\n")
+    quiz_state.add_event(student_id, skill, score, time, event_id)
+    cf_factors.fold_in(student_id, [(skill, score)], n_epochs=CF_FOLD_IN_EPOCHS)  # Only the new rating, O(1) per result
+
+# Full CF refit over the whole quiz history (periodic batch job)
+def refit_cf_model():
+    global model, cf_factors
+    ratings = pd.DataFrame(
+        [(student_id, skill, score) for student_id, events in quiz_state.events.items() for skill, score in events],
+        columns=["student", "skill", "score"],
+    )
+    refit_model = SVD()
+    refit_model.fit(Dataset.load_from_df(ratings, reader).build_full_trainset())
+    model, cf_factors = refit_model, SVDFactors.from_model(refit_model)
+    return model
 
 # 🎯 Function to Recommend Topics for the Next Quiz
 def recommend_topics_for_next_quiz(student_id, skills, top_n=3):
-    """Recommends topics for the next quiz, considering BKT mastery and time taken."""
-    student_key = str(student_id)
-    
-    # Update BKT mastery
-    for _, row in df[df["student"] == student_id].iterrows():
-        update_bkt_mastery(student_id, row["skill"], row["score"])
-    
+    """
+    Recommends topics for the next quiz, considering BKT mastery and time taken.
+    Costs O(len(skills)) plus the student's new events since the last call.
+    """
+    # Apply only observations not yet seen by BKT (each is applied exactly once)
+    quiz_state.sync(student_id)
+
     # Get predictions from CF model
-    predictions = {skill: model.predict(student_id, skill).est for skill in skills}
-    
-    # Update predictions with BKT mastery values
-    if student_key in bkt_mastery_data:
-        for skill in skills:
-            if str(skill) in bkt_mastery_data[student_key]:
-                predictions[skill] = bkt_mastery_data[student_key][str(skill)]
+    predictions = dict(zip(skills, cf_factors.predict_all(student_id, skills).tolist()))
 
-    # Normalize Time Taken
-    average_time_per_skill = df.groupby("skill")["time"].mean()
-    df["normalized_time"] = df["time"] / average_time_per_skill[df["skill"]].values
-    student_time = df[df["student"] == student_id].set_index("skill")["normalized_time"].to_dict()
+    # Update predictions with BKT mastery values
+    student_mastery = get_student_mastery(student_id)
+    for skill in skills:
+        if str(skill) in student_mastery:
+            predictions[skill] = student_mastery[str(skill)]
 
-    # Adjust mastery based on time taken
+    # Adjust mastery based on time taken (relative to the running per-skill average)
     for skill in skills:
-        if skill in student_time:
-            time_factor = student_time[skill]
+        time_factor = quiz_state.time_factor(student_id, skill)
+        if time_factor is not None:
             if time_factor > 1.2:
                 predictions[skill] *= 0.9
             elif time_factor < 0.8:
@@ -108,6 +237,7 @@ def recommend_topics_for_next_quiz(student_id, skills, top_n=3):
     return recommended_skills
 
 # 🔹 Run Next Quiz Recommendation
-student_id = 1
-skills = [101, 102, 103, 104, 105, 106, 107, 108, 109, 110]
-recommend_topics_for_next_quiz(student_id, skills)
+if __name__ == "__main__":
+    student_id = 1
+    skills = [101, 102, 103, 104, 105, 106, 107, 108, 109, 110]
+    recommend_topics_for_next_quiz(student_id, skills)
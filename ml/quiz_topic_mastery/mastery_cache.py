@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class MasteryCache:
+    """
+    Read-through per-student cache in front of a mastery store: a bounded LRU
+    whose entries also expire after ``ttl`` seconds. Writes through
+    ``update_bkt_mastery`` call ``invalidate``. The TTL bounds how stale an
+    entry can get when another process writes to a shared store.
+
+    Cached dicts are shared between readers and must not be mutated.
+    """
+
+    def __init__(self, loader, max_entries=10_000, ttl=30.0):
+        """
+        :param loader: Callable ``(student_id) -> {skill: p_mastery}`` reading the store.
+        :param max_entries: Maximum number of students kept in memory.
+        :param ttl: Seconds before an entry is reloaded (None = only on invalidation).
+        """
+        self.loader = loader
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # student key -> (expires_at, mastery)
+        self._in_flight = {}  # student key -> [generation, loads running]; generation counts invalidations
+        self._epoch = 0  # Bumped by ``clear``, which invalidates every running load
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, student_id):
+        """
+        Returns ``{skill: p_mastery}`` for one student, loading it on a miss.
+        """
+        key = str(student_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            state = self._in_flight.setdefault(key, [0, 0])
+            state[1] += 1
+            started = (state[0], self._epoch)
+
+        try:
+            mastery = self.loader(student_id)  # Outside the lock, so slow loads do not block hits
+        except BaseException:
+            with self._lock:
+                self._finish_load(key)
+            raise
+
+        with self._lock:
+            # Only cache if no write was invalidated since this load started;
+            # otherwise ``mastery`` may predate it
+            generation = self._finish_load(key)
+            if (generation, self._epoch) == started:
+                expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+                self._entries[key] = (expires_at, mastery)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return mastery
+
+    def _finish_load(self, key):
+        # Returns the key's generation and forgets it once no load is running
+        state = self._in_flight[key]
+        state[1] -= 1
+        if state[1] == 0:
+            del self._in_flight[key]
+        return state[0]
+
+    def invalidate(self, student_id):
+        """
+        Drops a student's entry after their mastery was written. Loads of that
+        student already in flight will not be cached.
+        """
+        key = str(student_id)
+        with self._lock:
+            state = self._in_flight.get(key)
+            if state is not None:
+                state[0] += 1
+            if self._entries.pop(key, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+
+    def stats(self):
+        """
+        Returns hit/miss/expiration/eviction/invalidation counters and the entry count.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
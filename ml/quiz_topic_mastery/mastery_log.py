@@ -0,0 +1,187 @@
+import json
+import os
+import time
+
+
+def canonical_key(key):
+    """
+    Canonical form of a student or skill key. Older files keyed ids that had
+    passed through a float column as ``"101.0"``; those map to ``"101"``.
+    """
+    key = str(key)
+    if key.endswith(".0") and key[:-2].lstrip("-").isdigit():
+        return key[:-2]
+    return key
+
+
+def normalize_mastery_keys(data):
+    """
+    Rewrites a mastery dict (``{student: {skill: p_mastery}}``) with canonical
+    keys. Where a legacy key and its canonical form are both present, the
+    canonical entry is the newer one and wins.
+
+    :return: New mastery dict.
+    """
+    def canonical_last(item):
+        return canonical_key(item[0]) == item[0]
+
+    normalized = {}
+    for student_key, skill_map in sorted(data.items(), key=canonical_last):
+        merged = normalized.setdefault(canonical_key(student_key), {})
+        for skill_key, p_mastery in sorted(skill_map.items(), key=canonical_last):
+            merged[canonical_key(skill_key)] = p_mastery
+    return normalized
+
+
+class MasteryLog:
+    """
+    Append-only write-ahead log for BKT mastery data.
+
+    Each update appends one compact ``[student, skill, p_mastery]`` record
+    instead of rewriting the whole mastery file. Records are group-committed:
+    the log is fsynced once every ``fsync_every`` records, or on the first
+    append more than ``fsync_interval`` seconds after the last sync; ``close``
+    commits whatever is left. Every ``compact_every`` records the current
+    data is written to the snapshot (``bkt_mastery.json`` format) and the log is
+    truncated. Records hold absolute values, so replaying a record twice (e.g.
+    after a crash between snapshot and truncate) is harmless. A torn record
+    left by a crash is cut off on ``load``, before appending resumes.
+
+    A record may also carry the student's quiz-history cursor (see
+    ``QuizEventState``), which is then committed with the mastery value and
+    snapshotted to ``cursor_path``.
+
+    Legacy ``"101.0"``-style keys are normalized on ``load`` (see
+    ``canonical_key``); the next compaction writes them back canonical.
+    """
+
+    def __init__(self, snapshot_path, log_path, fsync_every=64, fsync_interval=1.0, compact_every=10_000,
+                 cursor_path=None):
+        """
+        :param snapshot_path: JSON snapshot of the full mastery data.
+        :param log_path: Append-only log of updates since the last snapshot.
+        :param cursor_path: JSON snapshot of the per-student cursors (``{student: events applied}``).
+        :param fsync_every: Records per group commit (1 = fsync every update).
+        :param fsync_interval: Seconds after which the next append forces a sync.
+        :param compact_every: Records between automatic compactions.
+        """
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.cursor_path = cursor_path
+        self.data = {}
+        self.cursors = {}
+        self._file = None
+        self._pending = 0
+        self._since_compact = 0
+        self._last_sync = time.monotonic()
+
+    def load(self):
+        """
+        Loads the snapshot and replays the log tail on top of it.
+
+        :return: Mastery dict (``{student: {skill: p_mastery}}``), which the
+                 caller mutates in place; ``compact`` snapshots this object.
+        """
+        try:
+            with open(self.snapshot_path, "r") as file:
+                self.data = normalize_mastery_keys(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.data = {}
+        self.cursors = {}
+        if self.cursor_path is not None:
+            try:
+                with open(self.cursor_path, "r") as file:
+                    self.cursors = {canonical_key(student_key): applied
+                                    for student_key, applied in json.load(file).items()}
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+
+        replayed = 0
+        good_bytes = 0  # Offset just past the last complete, parseable record
+        try:
+            with open(self.log_path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break  # Torn final record from a crash mid-write
+                    try:
+                        student_key, skill_key, p_mastery, *applied = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError, TypeError, ValueError):
+                        break
+                    student_key, skill_key = canonical_key(student_key), canonical_key(skill_key)
+                    self.data.setdefault(student_key, {})[skill_key] = p_mastery
+                    if applied:
+                        self.cursors[student_key] = applied[0]
+                    replayed += 1
+                    good_bytes += len(line)
+            if os.path.getsize(self.log_path) > good_bytes:
+                # Cut the torn tail off, so new records are not appended onto it
+                with open(self.log_path, "r+b") as file:
+                    file.truncate(good_bytes)
+                    os.fsync(file.fileno())
+        except FileNotFoundError:
+            pass
+
+        self._since_compact = replayed
+        self._file = open(self.log_path, "a")
+        return self.data
+
+    def append(self, student_key, skill_key, p_mastery, applied=None):
+        """
+        Records one mastery value, and optionally the student's cursor after
+        it. O(1) amortized: the snapshot is only rewritten every
+        ``compact_every`` records.
+        """
+        record = [student_key, skill_key, p_mastery]
+        if applied is not None:
+            record.append(applied)
+            self.cursors[student_key] = applied
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._pending += 1
+        self._since_compact += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.commit()
+        if self._since_compact >= self.compact_every:
+            self.compact()
+
+    def commit(self):
+        """
+        Flushes buffered records and fsyncs the log.
+        """
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """
+        Writes the current data (and cursors) to the snapshots atomically and
+        truncates the log.
+        """
+        self.commit()
+        snapshots = [(self.snapshot_path, self.data)]
+        if self.cursor_path is not None:
+            snapshots.append((self.cursor_path, self.cursors))
+        for path, data in snapshots:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(data, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.log_path, "w")  # Truncate: the snapshot now covers every record
+        os.fsync(self._file.fileno())
+        self._since_compact = 0
+
+    def close(self):
+        if self._file is not None:
+            self.commit()
+            self._file.close()
+            self._file = None
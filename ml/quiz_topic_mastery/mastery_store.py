@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sqlite3
+import zlib
+from bkt_engine import CORRECT_THRESHOLD, DEFAULT_PARAMS, bkt_update
+from mastery_log import canonical_key, normalize_mastery_keys
+from quiz_state import positional_event_id
+
+
+def shard_of(student_key, shards):
+    """
+    Stable student -> shard assignment (the same in every process and run).
+    """
+    return zlib.crc32(str(student_key).encode("utf-8")) % shards
+
+
+class ShardedMasteryStore:
+    """
+    BKT mastery partitioned by student hash into ``shards`` SQLite files.
+
+    Each shard runs in WAL mode: readers never block and are served from a
+    memory-mapped file, while each update is a read-modify-write inside a
+    ``BEGIN IMMEDIATE`` transaction, which holds that shard's write lock. Any
+    number of processes can update the store at once. Updates to different
+    shards run in parallel, updates to one shard are serialized, and none are
+    lost. An update may carry a unique event id, recorded in the same
+    transaction, so an event delivered twice (by a restart or by another
+    process) is applied once. Connections are opened lazily per process, so
+    the store can be created before forking workers.
+    """
+
+    def __init__(self, directory, shards=16, params=None, mmap_size=256 << 20, busy_timeout=30.0, param_table=None):
+        """
+        :param directory: Directory holding ``mastery_<shard>.sqlite`` files.
+        :param shards: Number of shards (must stay the same for an existing store).
+        :param params: BKT parameter overrides (``p_init``, ``p_learn``, ``p_guess``, ``p_slip``).
+        :param mmap_size: Bytes of each shard file memory-mapped for reads.
+        :param busy_timeout: Seconds to wait for another process's shard lock.
+        :param param_table: Per-skill parameters (``{skill: {p_init, ...}}``) overriding ``params``.
+        """
+        self.directory = directory
+        self.shards = shards
+        self.params = dict(DEFAULT_PARAMS, **(params or {}))
+        self.param_table = param_table or {}
+        self.mmap_size = mmap_size
+        self.busy_timeout = busy_timeout
+        self._connections = {}
+        self._pid = None
+        os.makedirs(directory, exist_ok=True)
+        self._check_layout()
+
+    def _check_layout(self):
+        layout_path = os.path.join(self.directory, "layout.json")
+        try:
+            with open(layout_path, "r") as file:
+                existing = json.load(file)["shards"]
+        except FileNotFoundError:
+            tmp_path = f"{layout_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump({"shards": self.shards}, file)
+            os.replace(tmp_path, layout_path)
+            return
+        if existing != self.shards:
+            raise ValueError(f"Store {self.directory} has {existing} shards, not {self.shards}")
+
+    def _connection(self, shard):
+        if self._pid != os.getpid():
+            self._connections = {}  # Connections must not be shared with a parent process
+            self._pid = os.getpid()
+        connection = self._connections.get(shard)
+        if connection is None:
+            path = os.path.join(self.directory, f"mastery_{shard}.sqlite")
+            connection = sqlite3.connect(path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS mastery (student TEXT NOT NULL, skill TEXT NOT NULL, "
+                "p_mastery REAL NOT NULL, n_obs INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (student, skill)) WITHOUT ROWID"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS applied_events (event_id TEXT PRIMARY KEY) WITHOUT ROWID")
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applied'").fetchone():
+                self._convert_cursors(connection)
+            self._connections[shard] = connection
+        return connection
+
+    @staticmethod
+    def _convert_cursors(connection):
+        # Shards written before event ids kept one history position per student
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applied'").fetchone():
+                connection.executemany(
+                    "INSERT OR IGNORE INTO applied_events (event_id) VALUES (?)",
+                    ((positional_event_id(student_key, position),)
+                     for student_key, events in connection.execute("SELECT student, events FROM applied").fetchall()
+                     for position in range(1, events + 1)),
+                )
+                connection.execute("DROP TABLE applied")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _student_connection(self, student_key):
+        return self._connection(shard_of(student_key, self.shards))
+
+    def get(self, student_id, skill):
+        """
+        Returns the mastery of one pair, or None if it has never been observed.
+        """
+        student_key = str(student_id)
+        row = self._student_connection(student_key).execute(
+            "SELECT p_mastery FROM mastery WHERE student = ? AND skill = ?", (student_key, str(skill))
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get_student(self, student_id):
+        """
+        Returns ``{skill: p_mastery}`` for one student (empty if unknown).
+        """
+        student_key = str(student_id)
+        rows = self._student_connection(student_key).execute(
+            "SELECT skill, p_mastery FROM mastery WHERE student = ?", (student_key,)
+        )
+        return dict(rows.fetchall())
+
+    def observation_count(self, student_id, skill):
+        student_key = str(student_id)
+        row = self._student_connection(student_key).execute(
+            "SELECT n_obs FROM mastery WHERE student = ? AND skill = ?", (student_key, str(skill))
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def update(self, student_id, skill, score, event_id=None):
+        """
+        Applies one observation with the BKT update, atomically across processes.
+
+        :param event_id: Optional unique id of the observation. It is recorded in
+                         the same transaction, and an id already recorded is
+                         skipped, so each event is applied once even across
+                         restarts and processes.
+        :return: The new mastery probability (None if the observation was skipped and the pair is unseen).
+        """
+        student_key, skill_key = str(student_id), str(skill)
+        connection = self._student_connection(student_key)
+        connection.execute("BEGIN IMMEDIATE")  # Takes the shard's write lock before reading
+        try:
+            row = connection.execute(
+                "SELECT p_mastery FROM mastery WHERE student = ? AND skill = ?", (student_key, skill_key)
+            ).fetchone()
+            if event_id is not None:
+                inserted = connection.execute(
+                    "INSERT OR IGNORE INTO applied_events (event_id) VALUES (?)", (str(event_id),)
+                ).rowcount
+                if not inserted:
+                    connection.execute("COMMIT")
+                    return None if row is None else row[0]
+            params = self.param_table.get(skill_key, self.params)
+            p_mastery = params["p_init"] if row is None else row[0]
+            p_mastery = float(bkt_update(p_mastery, score >= CORRECT_THRESHOLD, params["p_learn"],
+                                         params["p_guess"], params["p_slip"]))
+            connection.execute(
+                "INSERT INTO mastery (student, skill, p_mastery, n_obs) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (student, skill) DO UPDATE SET p_mastery = excluded.p_mastery, n_obs = n_obs + 1",
+                (student_key, skill_key, p_mastery),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return p_mastery
+
+    def put_many(self, data, event_ids=None):
+        """
+        Writes absolute mastery values from a ``bkt_mastery.json``-format dict,
+        one transaction per shard.
+
+        :param event_ids: Optional ``{student: [event id, ...]}`` of events already
+                          reflected in ``data``; later updates carrying them are skipped.
+        """
+        by_shard = {}
+        for student_key, skill_map in data.items():
+            rows = by_shard.setdefault(shard_of(student_key, self.shards), ([], []))[0]
+            rows.extend((str(student_key), str(skill_key), float(p_mastery)) for skill_key, p_mastery in skill_map.items())
+        for student_key, ids in (event_ids or {}).items():
+            by_shard.setdefault(shard_of(student_key, self.shards), ([], []))[1].extend((str(event_id),) for event_id in ids)
+        for shard, (rows, ids) in by_shard.items():
+            connection = self._connection(shard)
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO mastery (student, skill, p_mastery) VALUES (?, ?, ?) "
+                    "ON CONFLICT (student, skill) DO UPDATE SET p_mastery = excluded.p_mastery",
+                    rows,
+                )
+                connection.executemany("INSERT OR IGNORE INTO applied_events (event_id) VALUES (?)", ids)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def to_dict(self):
+        """
+        Exports every shard in the ``bkt_mastery.json`` dict format.
+        """
+        data = {}
+        for shard in range(self.shards):
+            for student_key, skill_key, p_mastery in self._connection(shard).execute(
+                "SELECT student, skill, p_mastery FROM mastery"
+            ):
+                data.setdefault(student_key, {})[skill_key] = p_mastery
+        return data
+
+    def close(self):
+        if self._pid == os.getpid():
+            for connection in self._connections.values():
+                connection.close()
+        self._connections = {}
+
+
+def migrate_json(json_path, directory, shards=16, cursor_path=None):
+    """
+    Copies an existing ``bkt_mastery.json`` into a sharded store. With
+    ``cursor_path`` (``bkt_cursors.json``), the events each cursor covers are
+    marked applied by their positional ids (see ``QuizEventState``).
+
+    :return: Number of (student, skill) pairs migrated.
+    """
+    with open(json_path, "r") as file:
+        data = normalize_mastery_keys(json.load(file))
+    event_ids = None
+    if cursor_path is not None:
+        with open(cursor_path, "r") as file:
+            cursors = {canonical_key(student_key): events for student_key, events in json.load(file).items()}
+        event_ids = {student_key: [positional_event_id(student_key, position) for position in range(1, events + 1)]
+                     for student_key, events in cursors.items()}
+    store = ShardedMasteryStore(directory, shards)
+    store.put_many(data, event_ids)
+    store.close()
+    return sum(len(skill_map) for skill_map in data.values())
+
+
+# Example usage: python mastery_store.py bkt_mastery.json bkt_mastery_store --shards 16
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate bkt_mastery.json into a sharded mastery store.")
+    parser.add_argument("json_path", help="Existing bkt_mastery.json")
+    parser.add_argument("directory", help="Output directory for the shard files")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--cursors", default=None, help="Quiz-history cursors (bkt_cursors.json) to migrate too")
+    args = parser.parse_args()
+
+    pairs = migrate_json(args.json_path, args.directory, args.shards, args.cursors)
+    print(f"Migrated {pairs:,} student/skill pairs into {args.shards} shards in {args.directory}")
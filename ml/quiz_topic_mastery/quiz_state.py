@@ -0,0 +1,91 @@
+def positional_event_id(student_id, position):
+    """
+    Event id of the ``position``-th (1-based) event in a student's history, for
+    events recorded without their own id (sample data, older event files).
+    """
+    return f"{student_id}#{position}"
+
+
+class QuizEventState:
+    """
+    Incremental view of the quiz history used by the recommender.
+
+    Events are recorded once with ``add_event``. Each student has a cursor into
+    their own events, and ``sync`` applies only the events past the cursor to
+    BKT, so no observation is ever counted twice. Per-skill time averages are
+    kept as running sums, updated as events arrive, so a time factor costs O(1).
+
+    Every observation is passed on with its position in the student's history
+    and its event id. A single-writer store persists the position as the
+    student's cursor, and ``load_cursor`` restores it in a new process;
+    positions are only stable if the same history is recorded again on
+    restart, in the same order. A store shared by several processes, whose
+    histories differ, skips observations by event id instead. Events recorded
+    without an id get ``positional_event_id``.
+    """
+
+    def __init__(self, apply_observation, load_cursor=None):
+        """
+        :param apply_observation: Callable ``(student_id, skill, score, applied, event_id)``
+                                  that applies one observation to BKT mastery and
+                                  persists ``applied``, the student's cursor after
+                                  it, or ``event_id``.
+        :param load_cursor: Optional callable ``(student_id)`` returning the
+                            persisted cursor (0 if none), read on a student's first sync.
+        """
+        self.apply_observation = apply_observation
+        self.load_cursor = load_cursor
+        self.events = {}      # student -> [(skill, score), ...] in arrival order
+        self.event_ids = {}   # student -> [event id, ...], parallel to events
+        self.cursors = {}     # student -> number of events already applied to BKT
+        self.time_sum = {}    # skill -> total time over all students
+        self.time_count = {}  # skill -> number of attempts over all students
+        self.last_time = {}   # student -> {skill: time of the latest attempt}
+
+    def add_event(self, student_id, skill, score, time, event_id=None):
+        """
+        Records one quiz result. BKT is updated lazily on the next ``sync``.
+
+        :param event_id: Unique id of the result (defaults to ``positional_event_id``).
+        """
+        events = self.events.setdefault(student_id, [])
+        events.append((skill, score))
+        if event_id is None:
+            event_id = positional_event_id(student_id, len(events))
+        self.event_ids.setdefault(student_id, []).append(event_id)
+        self.time_sum[skill] = self.time_sum.get(skill, 0.0) + time
+        self.time_count[skill] = self.time_count.get(skill, 0) + 1
+        self.last_time.setdefault(student_id, {})[skill] = time
+
+    def add_events(self, events):
+        """
+        Records an iterable of ``(student, skill, score, time[, event_id])`` tuples.
+        """
+        for event in events:
+            self.add_event(*event)
+
+    def sync(self, student_id):
+        """
+        Applies the student's not-yet-applied events to BKT.
+
+        :return: Number of events applied.
+        """
+        events = self.events.get(student_id, [])
+        cursor = self.cursors.get(student_id)
+        if cursor is None:
+            cursor = self.load_cursor(student_id) if self.load_cursor is not None else 0
+        for position in range(cursor, len(events)):
+            skill, score = events[position]
+            self.apply_observation(student_id, skill, score, position + 1, self.event_ids[student_id][position])
+        self.cursors[student_id] = max(cursor, len(events))
+        return max(len(events) - cursor, 0)
+
+    def time_factor(self, student_id, skill):
+        """
+        Time of the student's latest attempt at ``skill`` divided by the
+        average time for that skill, or None if they never attempted it.
+        """
+        time = self.last_time.get(student_id, {}).get(skill)
+        if time is None:
+            return None
+        return time / (self.time_sum[skill] / self.time_count[skill])
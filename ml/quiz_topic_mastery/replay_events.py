@@ -0,0 +1,246 @@
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import time
+import numpy as np
+import pandas as pd
+from bkt_engine import BKTEngine, DEFAULT_PARAMS, load_param_table
+
+# Events are applied in file (arrival) order. The ``time`` column some event
+# files carry is quiz duration, not a timestamp, so it is not read.
+EVENT_COLUMNS = ["student", "skill", "score"]
+
+
+def iter_event_chunks(path, chunksize=1_000_000):
+    """
+    Streams quiz events from a CSV or Parquet file in bounded-memory chunks.
+
+    :param path: ``.csv`` or ``.parquet`` file with student, skill and score columns.
+    :param chunksize: Rows per chunk.
+    :return: Iterator of DataFrames.
+    """
+    if str(path).endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=EVENT_COLUMNS):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(path, usecols=EVENT_COLUMNS, chunksize=chunksize) as reader:
+            yield from reader
+
+
+def shard_of(students, shards):
+    """
+    Stable student -> shard assignment (the same in every process).
+    """
+    students = pd.Series(students)
+    if students.dtype == object:
+        students = students.astype(str)
+    hashes = pd.util.hash_pandas_object(students, index=False).to_numpy()
+    return (hashes % np.uint64(shards)).astype(np.int64)
+
+
+def save_checkpoint(path, engine, rows_done, chunksize):
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, rows_done=rows_done, chunksize=chunksize, **engine.state())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, chunksize, params):
+    """
+    :return: ``(engine, rows_done)``, or a fresh engine if there is no checkpoint.
+    """
+    if not os.path.exists(path):
+        return BKTEngine(**params), 0
+    with np.load(path) as checkpoint:
+        if int(checkpoint["chunksize"]) != chunksize:
+            raise ValueError(f"Checkpoint {path} was written with chunksize={int(checkpoint['chunksize'])}")
+        return BKTEngine.from_state(checkpoint, **params), int(checkpoint["rows_done"])
+
+
+def iter_routed_chunks(path, chunksize=1_000_000, shards=1):
+    """
+    Reads the event file once and splits every chunk by student shard.
+
+    Rows keep their file order within every part, so each student's
+    observations are applied in the order they were recorded (the order of an
+    append-only event log such as ``quiz_events.csv``).
+
+    :return: Iterator of ``(rows_seen, parts)`` where ``parts[shard]`` is a
+             ``(students, skills, scores)`` tuple of arrays.
+    """
+    rows_seen = 0
+    for chunk in iter_event_chunks(path, chunksize):
+        rows_seen += len(chunk)
+        if len(chunk) == 0:
+            continue
+        students, skills, scores = (chunk[column].to_numpy() for column in ("student", "skill", "score"))
+        if shards == 1:
+            yield rows_seen, [(students, skills, scores)]
+            continue
+        shard = shard_of(students, shards)
+        parts = []
+        for index in range(shards):
+            rows = np.flatnonzero(shard == index)
+            parts.append((students[rows], skills[rows], scores[rows]))
+        yield rows_seen, parts
+
+
+class ShardReplay:
+    """
+    BKT state of one student shard, fed routed chunks in file order and
+    checkpointed every ``checkpoint_every`` chunks.
+    """
+
+    def __init__(self, shard=0, shards=1, chunksize=1_000_000, params=None, checkpoint_dir=None,
+                 checkpoint_every=10, param_table=None):
+        params = dict(DEFAULT_PARAMS, **(params or {}), param_table=param_table)
+        self.chunksize = chunksize
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_path = None
+        self.engine, self.rows_done = BKTEngine(**params), 0
+        if checkpoint_dir is not None:
+            self.checkpoint_path = os.path.join(checkpoint_dir, f"shard_{shard}_of_{shards}.npz")
+            self.engine, self.rows_done = load_checkpoint(self.checkpoint_path, chunksize, params)
+        self.rows_seen = self.events = self.chunks = 0
+        self.seconds = 0.0
+
+    def apply(self, rows_seen, students, skills, scores):
+        """
+        Applies one routed chunk, unless the last checkpoint already covers it.
+        """
+        self.rows_seen = rows_seen
+        if rows_seen <= self.rows_done:
+            return
+        start = time.perf_counter()
+        self.engine.update_batch(students, skills, scores)
+        self.events += len(scores)
+        self.chunks += 1
+        if self.checkpoint_path is not None and self.chunks % self.checkpoint_every == 0:
+            save_checkpoint(self.checkpoint_path, self.engine, rows_seen, self.chunksize)
+        self.seconds += time.perf_counter() - start
+
+    def finish(self):
+        """
+        :return: ``(mastery_dict, events_applied, seconds)``
+        """
+        if self.checkpoint_path is not None:
+            save_checkpoint(self.checkpoint_path, self.engine, max(self.rows_seen, self.rows_done), self.chunksize)
+        return self.engine.to_dict(), self.events, self.seconds
+
+
+def _shard_worker(shard, shards, options, inbox, results):
+    # Applies the chunks routed to one shard until the reader sends None
+    try:
+        shard_replay = ShardReplay(shard, shards, **options)
+        for item in iter(inbox.get, None):
+            shard_replay.apply(*item)
+        results.put((shard, shard_replay.finish(), None))
+    except Exception as error:
+        results.put((shard, None, repr(error)))
+
+
+def _send(inbox, item, process):
+    # Blocking put that gives up if the shard worker has died
+    while True:
+        try:
+            inbox.put(item, timeout=1.0)
+            return
+        except queue.Full:
+            if not process.is_alive():
+                raise RuntimeError(f"Replay worker {process.name} exited early")
+
+
+def replay(path, output_path=None, chunksize=1_000_000, workers=1, params=None, checkpoint_dir=None,
+           checkpoint_every=10, param_table=None, queue_depth=2):
+    """
+    Rebuilds BKT mastery from scratch by replaying an event file.
+
+    The file is parsed once, in this process. With ``workers > 1`` students
+    are hash-partitioned into one shard per worker process; every parsed
+    chunk is split by shard and routed to the workers, which apply their
+    parts in file order. At most ``queue_depth`` chunks wait per worker.
+
+    :param path: CSV or Parquet event file (replayed in file order, see ``iter_routed_chunks``).
+    :param output_path: Optional ``bkt_mastery.json``-format output file.
+    :param params: BKT parameter overrides (``p_init``, ``p_learn``, ``p_guess``, ``p_slip``).
+    :param param_table: Per-skill parameters from fit_bkt_params.py, overriding ``params``.
+    :param checkpoint_dir: Directory for per-shard checkpoints; a rerun resumes from them.
+    :return: Mastery dict in the ``bkt_mastery.json`` format.
+    """
+    if checkpoint_dir is not None:
+        os.makedirs(checkpoint_dir, exist_ok=True)
+    options = dict(chunksize=chunksize, params=params, checkpoint_dir=checkpoint_dir,
+                   checkpoint_every=checkpoint_every, param_table=param_table)
+
+    start = time.perf_counter()
+    if workers == 1:
+        shard_replay = ShardReplay(0, 1, **options)
+        for rows_seen, parts in iter_routed_chunks(path, chunksize):
+            shard_replay.apply(rows_seen, *parts[0])
+        results = [shard_replay.finish()]
+    else:
+        results_queue = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue(maxsize=queue_depth) for _ in range(workers)]
+        processes = [multiprocessing.Process(target=_shard_worker, args=(shard, workers, options, inbox, results_queue),
+                                             name=f"replay-shard-{shard}", daemon=True)
+                     for shard, inbox in enumerate(inboxes)]
+        for process in processes:
+            process.start()
+        try:
+            for rows_seen, parts in iter_routed_chunks(path, chunksize, workers):
+                for inbox, process, part in zip(inboxes, processes, parts):
+                    _send(inbox, (rows_seen, *part), process)
+            for inbox, process in zip(inboxes, processes):
+                _send(inbox, None, process)
+            by_shard = {}
+            for _ in processes:
+                shard, result, error = results_queue.get()
+                if error is not None:
+                    raise RuntimeError(f"Replay of shard {shard} failed: {error}")
+                by_shard[shard] = result
+            results = [by_shard[shard] for shard in range(workers)]
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+    seconds = time.perf_counter() - start
+
+    mastery = {}
+    for shard_mastery, _, _ in results:
+        mastery.update(shard_mastery)  # Shards hold disjoint students
+    events = sum(shard_events for _, shard_events, _ in results)
+    print(f"Replayed {events:,} events in {seconds:.2f}s ({events / seconds:,.0f} events/sec)")
+
+    if output_path is not None:
+        with open(output_path, "w") as file:
+            json.dump(mastery, file, indent=4)
+    return mastery
+
+
+# Example usage: python replay_events.py quiz_events.parquet --output bkt_mastery.json --workers 4
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild BKT mastery by replaying a quiz event file.")
+    parser.add_argument("events_path", help="CSV or Parquet file with student, skill, score columns, in arrival order")
+    parser.add_argument("--output", default="bkt_mastery.json")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--checkpoint-every", type=int, default=10, help="Chunks between checkpoints")
+    parser.add_argument("--params-file", default=None, help="Per-skill parameter table from fit_bkt_params.py")
+    for name, value in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    replay(
+        args.events_path, args.output, chunksize=args.chunksize, workers=args.workers,
+        params={name: getattr(args, name) for name in DEFAULT_PARAMS},
+        checkpoint_dir=args.checkpoint_dir, checkpoint_every=args.checkpoint_every,
+        param_table=load_param_table(args.params_file) if args.params_file else None,
+    )
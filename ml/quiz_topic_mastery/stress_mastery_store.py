@@ -0,0 +1,76 @@
+import argparse
+import random
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from bkt_engine import bkt_update
+from mastery_store import ShardedMasteryStore
+
+
+def plan(worker, updates, students, skills):
+    """
+    The (student, skill) pairs one worker updates. Workers draw from the same
+    small pool of pairs, so they keep contending for the same rows.
+    """
+    rng = random.Random(worker)
+    return [(rng.randrange(students), 101 + rng.randrange(skills)) for _ in range(updates)]
+
+
+def run_worker(directory, shards, worker, updates, students, skills):
+    store = ShardedMasteryStore(directory, shards)
+    start = time.perf_counter()
+    for student_id, skill in plan(worker, updates, students, skills):
+        store.update(student_id, skill, 1.0)
+    store.close()
+    return time.perf_counter() - start
+
+
+def stress(directory, shards=8, workers=8, updates=2_000, students=20, skills=5):
+    """
+    Hammers one store from several processes and checks that no update was
+    lost. Every observation is a correct answer, so a pair's final mastery
+    depends only on how many updates it received and is checked exactly.
+
+    :return: Number of pairs whose count or mastery is wrong (0 on success).
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_worker, directory, shards, worker, updates, students, skills)
+                   for worker in range(workers)]
+        for future in futures:
+            future.result()
+    seconds = time.perf_counter() - start
+
+    expected = Counter(pair for worker in range(workers) for pair in plan(worker, updates, students, skills))
+    store = ShardedMasteryStore(directory, shards)
+    errors = 0
+    for (student_id, skill), count in expected.items():
+        p_mastery = store.params["p_init"]
+        for _ in range(count):
+            p_mastery = float(bkt_update(p_mastery, True, store.params["p_learn"], store.params["p_guess"],
+                                         store.params["p_slip"]))
+        if store.observation_count(student_id, skill) != count or abs(store.get(student_id, skill) - p_mastery) > 1e-12:
+            errors += 1
+    store.close()
+
+    total = workers * updates
+    print(f"{total:,} updates from {workers} processes in {seconds:.2f}s ({total / seconds:,.0f} updates/sec)")
+    print(f"{len(expected)} pairs checked, {errors} with lost updates")
+    return errors
+
+
+# Example usage: python stress_mastery_store.py --workers 8 --updates 2000
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrency stress test for the sharded mastery store.")
+    parser.add_argument("--directory", default=None, help="Empty store directory (a temporary one by default)")
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--updates", type=int, default=2_000, help="Updates per worker")
+    parser.add_argument("--students", type=int, default=20)
+    parser.add_argument("--skills", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        errors = stress(args.directory or tmp_dir, args.shards, args.workers, args.updates, args.students, args.skills)
+    raise SystemExit(1 if errors else 0)
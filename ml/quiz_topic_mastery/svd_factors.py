@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class SVDFactors:
+    """
+    Biases and latent factors exported from a fitted ``surprise.SVD``, with
+    vectorized predictions and an online fold-in for single students.
+
+    Predictions follow ``SVD.predict``: ``global_mean + bu + bi + qi . pu``,
+    where an unknown student or skill contributes nothing, clipped to the
+    rating scale. Skill factors are fixed between full refits; ``fold_in``
+    only re-estimates one student's bias and factors from their ratings.
+    """
+
+    def __init__(self, global_mean, rating_scale, user_ids, item_ids, bu, bi, pu, qi,
+                 lr_bu=0.005, lr_pu=0.005, reg_bu=0.02, reg_pu=0.02, n_epochs=20):
+        self.global_mean = float(global_mean)
+        self.rating_scale = tuple(rating_scale)
+        self.user_index = {user_id: row for row, user_id in enumerate(user_ids)}
+        self.item_index = {item_id: row for row, item_id in enumerate(item_ids)}
+        self.user_ids = list(user_ids)
+        self.item_ids = list(item_ids)
+        self.bu = np.asarray(bu, dtype=np.float64)
+        self.bi = np.asarray(bi, dtype=np.float64)
+        self.pu = np.asarray(pu, dtype=np.float64)
+        self.qi = np.asarray(qi, dtype=np.float64)
+        self.lr_bu, self.lr_pu = lr_bu, lr_pu
+        self.reg_bu, self.reg_pu = reg_bu, reg_pu
+        self.n_epochs = n_epochs
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Exports the factors of a fitted biased ``surprise.SVD``.
+        """
+        trainset = model.trainset
+        return cls(
+            trainset.global_mean, trainset.rating_scale,
+            [trainset.to_raw_uid(inner_id) for inner_id in range(trainset.n_users)],
+            [trainset.to_raw_iid(inner_id) for inner_id in range(trainset.n_items)],
+            model.bu, model.bi, model.pu, model.qi,
+            lr_bu=model.lr_bu, lr_pu=model.lr_pu, reg_bu=model.reg_bu, reg_pu=model.reg_pu,
+            n_epochs=model.n_epochs,
+        )
+
+    def save(self, path):
+        np.savez(
+            path, global_mean=self.global_mean, rating_scale=np.array(self.rating_scale, dtype=np.float64),
+            user_ids=np.asarray(self.user_ids), item_ids=np.asarray(self.item_ids),
+            bu=self.bu, bi=self.bi, pu=self.pu, qi=self.qi,
+            hyperparams=np.array([self.lr_bu, self.lr_pu, self.reg_bu, self.reg_pu, self.n_epochs]),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            lr_bu, lr_pu, reg_bu, reg_pu, n_epochs = data["hyperparams"].tolist()
+            return cls(
+                data["global_mean"], data["rating_scale"].tolist(),
+                data["user_ids"].tolist(), data["item_ids"].tolist(),
+                data["bu"], data["bi"], data["pu"], data["qi"],
+                lr_bu=lr_bu, lr_pu=lr_pu, reg_bu=reg_bu, reg_pu=reg_pu, n_epochs=int(n_epochs),
+            )
+
+    @staticmethod
+    def _rows(ids, index):
+        return np.array([index.get(raw_id, -1) for raw_id in ids], dtype=np.int64)
+
+    def _user_terms(self, students):
+        rows = self._rows(students, self.user_index)
+        known = rows >= 0
+        return np.where(known, self.bu[rows], 0.0), np.where(known[:, None], self.pu[rows], 0.0)
+
+    def _item_terms(self, skills):
+        cols = self._rows(skills, self.item_index)
+        known = cols >= 0
+        return np.where(known, self.bi[cols], 0.0), np.where(known[:, None], self.qi[cols], 0.0)
+
+    def predict_matrix(self, students, skills):
+        """
+        Estimates for every student x skill.
+
+        :return: float array of shape ``(len(students), len(skills))``.
+        """
+        user_bias, user_factors = self._user_terms(students)
+        item_bias, item_factors = self._item_terms(skills)
+        estimates = self.global_mean + user_bias[:, None] + item_bias[None, :] + user_factors @ item_factors.T
+        lower, upper = self.rating_scale
+        return np.clip(estimates, lower, upper)
+
+    def predict_all(self, student_id, skills=None):
+        """
+        Estimates for one student over ``skills`` (default: every known skill).
+
+        :return: float array aligned to ``skills``.
+        """
+        return self.predict_matrix([student_id], self.item_ids if skills is None else skills)[0]
+
+    def predict(self, student_id, skill):
+        return float(self.predict_matrix([student_id], [skill])[0, 0])
+
+    def _add_user(self, student_id):
+        row = len(self.user_ids)
+        self.user_index[student_id] = row
+        self.user_ids.append(student_id)
+        self.bu = np.append(self.bu, 0.0)
+        self.pu = np.vstack([self.pu, np.zeros((1, self.pu.shape[1]))])
+        return row
+
+    def fold_in(self, student_id, ratings, n_epochs=None):
+        """
+        Updates one student's bias and factors from their ratings with the
+        same SGD steps ``SVD.fit`` uses, keeping every skill's parameters
+        fixed. Known students start from their current factors, new ones from
+        zero. Ratings for skills the model has never seen only move the bias.
+
+        For online updates pass only the new ratings with a small ``n_epochs``:
+        the earlier ratings are already reflected in the current factors, and
+        re-running them on every update would keep pulling the factors further
+        toward them.
+
+        :param student_id: Raw student id (new ids are added).
+        :param ratings: Iterable of ``(skill, score)`` pairs.
+        :param n_epochs: SGD passes over the ratings (default: the model's).
+        :return: Number of ratings used.
+        """
+        ratings = list(ratings)
+        row = self.user_index.get(student_id)
+        if row is None:
+            row = self._add_user(student_id)
+        if not ratings:
+            return 0
+
+        skills, scores = zip(*ratings)
+        item_bias, item_factors = self._item_terms(skills)
+        user_bias, user_factors = self.bu[row], self.pu[row].copy()
+        for _ in range(self.n_epochs if n_epochs is None else n_epochs):
+            for bias, factors, score in zip(item_bias, item_factors, scores):
+                err = score - (self.global_mean + user_bias + bias + factors @ user_factors)
+                user_bias += self.lr_bu * (err - self.reg_bu * user_bias)
+                user_factors += self.lr_pu * (err * factors - self.reg_pu * user_factors)
+        self.bu[row], self.pu[row] = user_bias, user_factors
+        return len(ratings)